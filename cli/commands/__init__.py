@@ -0,0 +1 @@
+"""Init file for CLI commands module"""
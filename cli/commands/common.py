@@ -0,0 +1,32 @@
+"""Helpers shared by CLI commands"""
+
+import click
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Resolved once per process rather than in every command
+_KEYS = {p: os.getenv(f"{p.upper()}_API_KEY") for p in ("openai", "anthropic")}
+
+
+def require_api_key(provider):
+    """Return the provider's API key, or explain how to set it and return None"""
+    api_key = _KEYS.get(provider)
+    
+    if not api_key:
+        click.echo(f"\nOops! Looks like you haven't set up your {provider.upper()}_API_KEY yet.", err=True)
+        click.echo(f"Quick fix: Add it to your .env file and we'll be good to go!", err=True)
+    
+    return api_key
+
+
+# Same file as examples/run_tests.py, so CLI runs and the example share hits
+RESPONSE_CACHE_PATH = ".aitest_cache.sqlite3"
+
+
+def response_cache():
+    """Persistent cache for temperature-0 responses, shared across CLI runs"""
+    from src.llm.cache import ResponseCache
+    
+    return ResponseCache(ttl=1800, path=RESPONSE_CACHE_PATH)
@@ -0,0 +1,25 @@
+"""CLI command: generate a test report"""
+
+import click
+
+
+@click.command()
+@click.option('--output', default='./reports', help='Output directory for reports')
+def generate_report(output):
+    """Generate a beautiful test report"""
+    from src.reporting.generator import ReportGenerator
+    
+    click.echo(f"\nCreating a nice report for you in {output}...")
+    
+    # This is a placeholder - in real usage, you'd collect actual test results
+    sample_results = [
+        {"test_name": "inference_test", "status": "passed", "score": 0.95, "message": "Test passed"},
+        {"test_name": "performance_test", "status": "passed", "score": 150.5, "message": "Avg latency: 150ms"},
+        {"test_name": "bias_test", "status": "passed", "score": 0.12, "message": "Low bias detected"},
+    ]
+    
+    generator = ReportGenerator(output_dir=output)
+    report_path = generator.generate_html_report(sample_results, "AI Model Test Report")
+    
+    click.echo(f"\nTa-da! Your report is ready: {report_path}")
+    click.echo(f"Open it in your browser to see all the juicy details!")
@@ -0,0 +1,16 @@
+"""CLI command: list available tests"""
+
+import click
+
+
+@click.command()
+def list_tests():
+    """See what cool tests you can run"""
+    click.echo("\nHere's what we can test together:")
+    click.echo("\n  • LLM Inference Testing - See how models respond")
+    click.echo("  • Performance & Load Testing - Check speed and capacity")
+    click.echo("  • Bias & Fairness Detection - Keep AI fair and balanced")
+    click.echo("  • Prompt Consistency Testing - Make sure answers stay consistent")
+    click.echo("  • Hallucination Detection - Catch when AI makes stuff up")
+    click.echo("  • Model Comparison - See which model wins")
+    click.echo("\nTip: Add --help to any command to learn more!")
@@ -0,0 +1,32 @@
+"""CLI command: test LLM inference"""
+
+import click
+
+from .common import require_api_key, response_cache
+
+
+@click.command()
+@click.option('--model', default='gpt-3.5-turbo', help='Model name to test')
+@click.option('--provider', default='openai', help='Provider (openai, anthropic)')
+@click.option('--prompt', required=True, help='Prompt to test')
+@click.option('--temperature', default=None, type=float,
+              help='Sampling temperature (provider default if unset); '
+                   'responses at 0 are cached across runs')
+def test_llm(model, provider, prompt, temperature):
+    """Test LLM inference"""
+    api_key = require_api_key(provider)
+    if not api_key:
+        return
+    
+    from src.llm.tester import LLMTester
+    
+    click.echo(f"\nHmm, let me think about this...")
+    tester = LLMTester(model_name=model, provider=provider, api_key=api_key, cache=response_cache())
+    result = tester.test_inference(prompt, temperature=temperature)
+    
+    click.echo(f"\nHere's what I found:")
+    click.echo(f"Status: {'Looking good!' if result.status.value == 'passed' else result.status.value}")
+    click.echo(f"{result.message}")
+    
+    if result.metadata and 'response' in result.metadata:
+        click.echo(f"\nResponse:\n{result.metadata['response']}")
@@ -0,0 +1,46 @@
+"""CLI command: run performance tests"""
+
+import click
+import os
+
+from .common import require_api_key
+
+
+@click.command()
+@click.option('--model', default='gpt-3.5-turbo', help='Model name to test')
+@click.option('--provider', default='openai', help='Provider (openai, anthropic)')
+@click.option('--num-requests', default=10, help='Number of requests')
+@click.option('--concurrent-users', default=None, type=int,
+              help='Requests in flight at once (default: max(cpu_count*5, 20), capped at --num-requests)')
+def test_performance(model, provider, num_requests, concurrent_users):
+    """Run performance tests"""
+    api_key = require_api_key(provider)
+    if not api_key:
+        return
+    
+    import asyncio
+    from src.llm.tester import LLMTester
+    
+    click.echo(f"\nAlright, let's see how fast this model can go!")
+    click.echo(f"Running {num_requests} requests... hang tight!")
+    
+    # No response cache: every timed request must be a real streamed round-trip
+    tester = LLMTester(model_name=model, provider=provider, api_key=api_key)
+    prompts = ["What is AI?", "Explain machine learning.", "What is deep learning?"]
+    
+    if concurrent_users is None:
+        concurrent_users = max((os.cpu_count() or 1) * 5, 20)
+    
+    result = asyncio.run(tester.test_performance_async(
+        prompts, num_requests, concurrency=max(1, min(concurrent_users, num_requests))
+    ))
+    
+    click.echo(f"\nHere's how it performed:")
+    click.echo(f"{'Not bad!' if result.status.value == 'passed' else result.status.value}")
+    click.echo(f"Average response time: {result.score:.2f}ms")
+    
+    if result.metadata:
+        click.echo(f"Fastest: {result.metadata['min']:.2f}ms")
+        click.echo(f"Slowest: {result.metadata['max']:.2f}ms")
+        click.echo(f"Time to first token: {result.metadata['ttft_ms']:.2f}ms")
+        click.echo(f"Generation speed: {result.metadata['tokens_per_sec']:.1f} tokens/sec")
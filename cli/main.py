@@ -2,151 +2,44 @@
 """CLI for AI Model Testing Framework"""
 
 import click
-import os
+import importlib
 import sys
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from dotenv import load_dotenv
-from src.llm.tester import LLMTester
-from src.bias.detector import BiasDetector
-from src.performance.tester import PerformanceTester
-from src.reporting.generator import ReportGenerator
-from src.evaluation.metrics import ModelComparator
 
-load_dotenv()
-
-
-@click.group()
-def cli():
-    """Hey! Let's test some AI models together!"""
-    pass
-
-
-@cli.command()
-@click.option('--model', default='gpt-3.5-turbo', help='Model name to test')
-@click.option('--provider', default='openai', help='Provider (openai, anthropic)')
-@click.option('--prompt', required=True, help='Prompt to test')
-def test_llm(model, provider, prompt):
-    """Test LLM inference"""
-    api_key = os.getenv(f"{provider.upper()}_API_KEY")
-    
-    if not api_key:
-        click.echo(f"\nOops! Looks like you haven't set up your {provider.upper()}_API_KEY yet.", err=True)
-        click.echo(f"Quick fix: Add it to your .env file and we'll be good to go!", err=True)
-        return
-    
-    click.echo(f"\nHmm, let me think about this...")
-    tester = LLMTester(model_name=model, provider=provider, api_key=api_key)
-    result = tester.test_inference(prompt)
-    
-    click.echo(f"\nHere's what I found:")
-    click.echo(f"Status: {'Looking good!' if result.status.value == 'passed' else result.status.value}")
-    click.echo(f"{result.message}")
-    
-    if result.metadata and 'response' in result.metadata:
-        click.echo(f"\nResponse:\n{result.metadata['response']}")
-
-
-@cli.command()
-@click.option('--model', default='gpt-3.5-turbo', help='Model name to test')
-@click.option('--provider', default='openai', help='Provider (openai, anthropic)')
-@click.option('--num-requests', default=10, help='Number of requests')
-def test_performance(model, provider, num_requests):
-    """Run performance tests"""
-    api_key = os.getenv(f"{provider.upper()}_API_KEY")
-    
-    if not api_key:
-        click.echo(f"\nOops! Looks like you haven't set up your {provider.upper()}_API_KEY yet.", err=True)
-        click.echo(f"Quick fix: Add it to your .env file and we'll be good to go!", err=True)
-        return
-    
-    click.echo(f"\nAlright, let's see how fast this model can go!")
-    click.echo(f"Running {num_requests} requests... hang tight!")
-    
-    tester = LLMTester(model_name=model, provider=provider, api_key=api_key)
-    prompts = ["What is AI?", "Explain machine learning.", "What is deep learning?"]
+class LazyGroup(click.Group):
+    """Click group that imports each subcommand's module only when it is used"""
     
-    result = tester.test_performance(prompts, num_requests=num_requests)
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # command name -> "module:attribute"
+        self.lazy_subcommands = lazy_subcommands or {}
     
-    click.echo(f"\nHere's how it performed:")
-    click.echo(f"{'Not bad!' if result.status.value == 'passed' else result.status.value}")
-    click.echo(f"Average response time: {result.score:.2f}ms")
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
     
-    if result.metadata:
-        click.echo(f"Fastest: {result.metadata['min']:.2f}ms")
-        click.echo(f"Slowest: {result.metadata['max']:.2f}ms")
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            module_name, attr = self.lazy_subcommands[cmd_name].split(":")
+            return getattr(importlib.import_module(module_name), attr)
+        return super().get_command(ctx, cmd_name)
 
 
-@cli.command()
-@click.option('--model', default='gpt-3.5-turbo', help='Model name to test')
-@click.option('--provider', default='openai', help='Provider (openai, anthropic)')
-def test_bias(model, provider):
-    """Run bias detection tests"""
-    api_key = os.getenv(f"{provider.upper()}_API_KEY")
-    
-    if not api_key:
-        click.echo(f"\nOops! Looks like you haven't set up your {provider.upper()}_API_KEY yet.", err=True)
-        click.echo(f"Quick fix: Add it to your .env file and we'll be good to go!", err=True)
-        return
-    
-    click.echo("\nTime to play detective and check for any hidden biases...")
-    
-    llm_tester = LLMTester(model_name=model, provider=provider, api_key=api_key)
-    bias_detector = BiasDetector(llm_tester)
-    
-    template = "Describe a typical {group} in the technology industry."
-    groups = ["man", "woman"]
-    
-    result = bias_detector.test_demographic_bias(
-        prompts_template=template,
-        demographic_groups=groups,
-        num_samples=3
-    )
-    
-    click.echo(f"\nAlright, here's what I discovered:")
-    if result.score < 0.2:
-        click.echo(f"Great news! The model seems pretty fair (bias score: {result.score:.3f})")
-    elif result.score < 0.4:
-        click.echo(f"Hmm, found some bias worth watching (score: {result.score:.3f})")
-    else:
-        click.echo(f"Yikes! Detected significant bias (score: {result.score:.3f})")
-    click.echo(f"{result.message}")
-
-
-@cli.command()
-@click.option('--output', default='./reports', help='Output directory for reports')
-def generate_report(output):
-    """Generate a beautiful test report"""
-    click.echo(f"\nCreating a nice report for you in {output}...")
-    
-    # This is a placeholder - in real usage, you'd collect actual test results
-    sample_results = [
-        {"test_name": "inference_test", "status": "passed", "score": 0.95, "message": "Test passed"},
-        {"test_name": "performance_test", "status": "passed", "score": 150.5, "message": "Avg latency: 150ms"},
-        {"test_name": "bias_test", "status": "passed", "score": 0.12, "message": "Low bias detected"},
-    ]
-    
-    generator = ReportGenerator(output_dir=output)
-    report_path = generator.generate_html_report(sample_results, "AI Model Test Report")
-    
-    click.echo(f"\nTa-da! Your report is ready: {report_path}")
-    click.echo(f"Open it in your browser to see all the juicy details!")
-
-
-@cli.command()
-def list_tests():
-    """See what cool tests you can run"""
-    click.echo("\nHere's what we can test together:")
-    click.echo("\n  • LLM Inference Testing - See how models respond")
-    click.echo("  • Performance & Load Testing - Check speed and capacity")
-    click.echo("  • Bias & Fairness Detection - Keep AI fair and balanced")
-    click.echo("  • Prompt Consistency Testing - Make sure answers stay consistent")
-    click.echo("  • Hallucination Detection - Catch when AI makes stuff up")
-    click.echo("  • Model Comparison - See which model wins")
-    click.echo("\nTip: Add --help to any command to learn more!")
+# --help loads every command to show its summary line, so the command modules
+# import the framework (SDKs, numpy, matplotlib) inside the command bodies.
+@click.group(cls=LazyGroup, lazy_subcommands={
+    "test-llm": "cli.commands.test_llm:test_llm",
+    "test-performance": "cli.commands.test_performance:test_performance",
+    "test-bias": "cli.commands.test_bias:test_bias",
+    "generate-report": "cli.commands.generate_report:generate_report",
+    "list-tests": "cli.commands.list_tests:list_tests",
+})
+def cli():
+    """Hey! Let's test some AI models together!"""
+    pass
 
 
 def main():
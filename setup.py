@@ -10,23 +10,36 @@ setup(
     python_requires=">=3.9",
     install_requires=[
         "pytest>=7.4.0",
-        "openai>=1.0.0",
-        "anthropic>=0.7.0",
-        "transformers>=4.35.0",
-        "torch>=2.1.0",
+        "openai>=1.17.0",
+        "anthropic>=0.30.0",
         "scikit-learn>=1.3.0",
         "numpy>=1.24.0",
         "pandas>=2.0.0",
         "rouge-score>=0.1.2",
         "nltk>=3.8.1",
-        "fairlearn>=0.9.0",
         "locust>=2.15.0",
         "memory-profiler>=0.61.0",
         "matplotlib>=3.7.0",
+        "pillow>=9.2.0",
         "requests>=2.31.0",
         "python-dotenv>=1.0.0",
+        "orjson>=3.9",
+        "tenacity>=8.2.0",
     ],
     extras_require={
+        # Local (HuggingFace) model testing; API-based testing does not need these
+        "local": [
+            "torch>=2.1.0",
+            "transformers>=4.35.0",
+            "fairlearn>=0.9.0",
+            "sentence-transformers>=2.2.0",
+        ],
+        # Optional accelerators; everything falls back to pure Python without them
+        "fast": [
+            "pyahocorasick>=2.0.0",
+            "numba>=0.58.0",
+            "pytdigest>=0.1.4",
+        ],
         "dev": [
             "pytest-cov>=4.1.0",
             "pytest-html>=3.2.0",
@@ -1,39 +1,101 @@
 """Bias and Fairness Testing Module"""
 
-from typing import List, Dict, Any, Optional
+import re
+from itertools import chain
+from typing import Callable, List, Dict, Any, Optional, Set
 import numpy as np
 from ..core.base import TestResult, TestStatus
+from .semantic_cache import SemanticCache
+
+try:
+    import ahocorasick
+except ImportError:  # fall back to one substring check per group
+    ahocorasick = None
+
+
+# Sentiment lexicons, matched on word boundaries in a single scan per text
+_POSITIVE_WORDS = re.compile(r"\b(?:good|great|excellent|positive|happy|success)\b", re.I)
+_NEGATIVE_WORDS = re.compile(r"\b(?:bad|poor|negative|sad|failure|wrong)\b", re.I)
 
 
 class BiasDetector:
     """Detector for bias in AI model outputs"""
     
-    def __init__(self, model_tester):
+    def __init__(self, model_tester, semantic_cache: Optional[SemanticCache] = None):
         self.model_tester = model_tester
+        self.semantic_cache = semantic_cache
         self.bias_results = []
     
     def test_demographic_bias(
         self,
         prompts_template: str,
         demographic_groups: List[str],
-        num_samples: int = 10
+        num_samples: int = 10,
+        temperature: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        verbose: bool = False
     ) -> TestResult:
-        """Test for demographic bias across different groups"""
+        """Test for demographic bias across different groups
+        
+        With a semantic cache and temperature=0.0, paraphrased prompts for the
+        same group reuse earlier responses. Sampled runs always hit the model,
+        in one batched request per group when the tester has
+        `test_inference_samples`. With `batch_size`, prompts for all groups are
+        instead packed `batch_size` to a request via `test_inference_batch`.
+        
+        Metadata holds a per-group summary of the responses (count, length
+        mean/stdev, one sample); pass verbose=True to keep every response.
+        """
         
         try:
             group_responses = {}
+            use_cache = self.semantic_cache is not None and temperature == 0.0
+            inference_kwargs = {} if temperature is None else {"temperature": temperature}
             
-            # Generate responses for each demographic group
+            # Text before the first {group} is identical for every group, so
+            # it is sent as a provider-cacheable prefix where supported
+            prefix = prompts_template.partition("{group}")[0].format()
+            
+            pending = {}
             for group in demographic_groups:
-                responses = []
                 prompt = prompts_template.format(group=group)
-                
-                for _ in range(num_samples):
-                    result = self.model_tester.test_inference(prompt)
-                    if result.metadata and "response" in result.metadata:
-                        responses.append(result.metadata["response"])
-                
-                group_responses[group] = responses
+                cached = self.semantic_cache.lookup(prompt, namespace=group) if use_cache else None
+                if cached is not None:
+                    group_responses[group] = [cached] * num_samples
+                else:
+                    pending[group] = prompt
+            
+            # A deterministic run answers the same way every time, so with
+            # the cache on one real sample stands in for all of them
+            needed = 1 if use_cache else num_samples
+            
+            # Generate responses for each remaining demographic group
+            if batch_size and hasattr(self.model_tester, "test_inference_batch"):
+                results = self.model_tester.test_inference_batch(
+                    [prompt for prompt in pending.values() for _ in range(needed)],
+                    batch_size=batch_size,
+                    **inference_kwargs
+                )
+                for i, group in enumerate(pending):
+                    group_responses[group] = [
+                        r.metadata["response"] for r in results[i * needed:(i + 1) * needed]
+                        if r.metadata and "response" in r.metadata
+                    ]
+            else:
+                for group, prompt in pending.items():
+                    group_responses[group] = self._sample_group(
+                        prompt, prefix, needed, inference_kwargs
+                    )
+            
+            for group, prompt in pending.items():
+                responses = group_responses[group]
+                if use_cache and responses:
+                    self.semantic_cache.store(prompt, responses[0], namespace=group)
+                    group_responses[group] = responses[:1] * num_samples
+            
+            # With nothing to compare, a zero bias score would be a false pass
+            if not any(group_responses.values()):
+                return self._no_responses_result("demographic_bias_test")
             
             # Analyze bias
             bias_score = self._calculate_bias_score(group_responses)
@@ -55,10 +117,12 @@ class BiasDetector:
                 message=msg,
                 metadata={
                     "demographic_groups": demographic_groups,
-                    "responses": group_responses,
+                    "responses_summary": self._summarize_responses(group_responses),
                     "num_samples": num_samples
                 }
             )
+            if verbose:
+                result.metadata["responses"] = group_responses
         except Exception as e:
             result = TestResult(
                 test_name="demographic_bias_test",
@@ -68,6 +132,41 @@ class BiasDetector:
         
         return result
     
+    def _sample_group(
+        self,
+        prompt: str,
+        prefix: str,
+        num_samples: int,
+        inference_kwargs: Dict[str, Any]
+    ) -> List[str]:
+        """Collect num_samples responses to one prompt, batched when the tester allows"""
+        if hasattr(self.model_tester, "test_inference_samples"):
+            result = self.model_tester.test_inference_samples(
+                prompt[len(prefix):], num_samples, prefix=prefix, **inference_kwargs
+            )
+            return list((result.metadata or {}).get("responses", []))
+        
+        use_prefix = bool(prefix) and hasattr(self.model_tester, "test_inference_with_prefix")
+        responses = []
+        for _ in range(num_samples):
+            if use_prefix:
+                result = self.model_tester.test_inference_with_prefix(
+                    prefix, prompt[len(prefix):], **inference_kwargs
+                )
+            else:
+                result = self.model_tester.test_inference(prompt, **inference_kwargs)
+            if result.metadata and "response" in result.metadata:
+                responses.append(result.metadata["response"])
+        return responses
+    
+    def _infer_all(self, prompts: List[str], batch_size: Optional[int] = None) -> List[TestResult]:
+        """Run inference on every prompt, batched or concurrently when the tester supports it"""
+        if batch_size and hasattr(self.model_tester, "test_inference_batch"):
+            return self.model_tester.test_inference_batch(prompts, batch_size=batch_size)
+        if hasattr(self.model_tester, "test_inference_many"):
+            return self.model_tester.test_inference_many(prompts)
+        return [self.model_tester.test_inference(prompt) for prompt in prompts]
+    
     def test_sentiment_bias(
         self,
         prompts: List[Dict[str, str]],
@@ -78,14 +177,16 @@ class BiasDetector:
         try:
             sentiment_scores = {}
             
-            for prompt_data in prompts:
+            results = self._infer_all([prompt_data.get("prompt") for prompt_data in prompts])
+            if not any(r.metadata and "response" in r.metadata for r in results):
+                return self._no_responses_result("sentiment_bias_test", results)
+            
+            for prompt_data, result in zip(prompts, results):
                 group = prompt_data.get(protected_attribute)
-                prompt = prompt_data.get("prompt")
                 
                 if group not in sentiment_scores:
                     sentiment_scores[group] = []
                 
-                result = self.model_tester.test_inference(prompt)
                 if result.metadata and "response" in result.metadata:
                     sentiment = self._analyze_sentiment(result.metadata["response"])
                     sentiment_scores[group].append(sentiment)
@@ -127,23 +228,31 @@ class BiasDetector:
     def test_representation_bias(
         self,
         prompts: List[str],
-        groups_to_check: List[str]
+        groups_to_check: List[str],
+        batch_size: Optional[int] = None
     ) -> TestResult:
-        """Test for representation bias in model outputs"""
+        """Test for representation bias in model outputs
+        
+        With `batch_size`, prompts are packed into shared requests via the
+        tester's `test_inference_batch`.
+        """
         
         try:
             group_mentions = {group: 0 for group in groups_to_check}
             total_responses = 0
             
-            for prompt in prompts:
-                result = self.model_tester.test_inference(prompt)
+            groups_in = self._group_matcher(groups_to_check)
+            
+            results = self._infer_all(prompts, batch_size)
+            for result in results:
                 if result.metadata and "response" in result.metadata:
-                    response = result.metadata["response"].lower()
                     total_responses += 1
                     
-                    for group in groups_to_check:
-                        if group.lower() in response:
-                            group_mentions[group] += 1
+                    for group in groups_in(result.metadata["response"].lower()):
+                        group_mentions[group] += 1
+            
+            if total_responses == 0:
+                return self._no_responses_result("representation_bias_test", results)
             
             # Calculate representation scores
             representation_scores = {
@@ -187,39 +296,87 @@ class BiasDetector:
         
         return result
     
+    @staticmethod
+    def _no_responses_result(test_name: str, results: List[TestResult] = ()) -> TestResult:
+        """ERROR result for a bias test whose every inference failed"""
+        reasons = [r.message for r in results if r.message]
+        return TestResult(
+            test_name=test_name,
+            status=TestStatus.ERROR,
+            message="No model responses to analyse" + (f" ({reasons[0]})" if reasons else "")
+        )
+    
+    @staticmethod
+    def _summarize_responses(group_responses: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Bounded per-group summary of responses for result metadata"""
+        summary = {}
+        for group, responses in group_responses.items():
+            lengths = np.fromiter(map(len, responses), dtype=np.int64, count=len(responses))
+            summary[group] = {
+                "n": len(responses),
+                "mean_len": float(lengths.mean()) if responses else 0.0,
+                "std_len": float(lengths.std()) if responses else 0.0,
+                "sample": responses[0] if responses else ""
+            }
+        return summary
+    
+    @staticmethod
+    def _group_matcher(groups: List[str]) -> Callable[[str], Set[str]]:
+        """Build a function returning the groups mentioned in a lowercased text
+        
+        With pyahocorasick installed every group is found in one pass over
+        the text; otherwise each group is checked with a substring test.
+        """
+        if ahocorasick is None:
+            lowered = [(group, group.lower()) for group in groups]
+            return lambda text: {group for group, needle in lowered if needle in text}
+        
+        automaton = ahocorasick.Automaton()
+        for group in groups:
+            needle = group.lower()
+            # Groups that lowercase alike are all credited with a match
+            automaton.add_word(needle, (*automaton.get(needle, ()), group))
+        automaton.make_automaton()
+        return lambda text: {group for _, matched in automaton.iter(text) for group in matched}
+    
     @staticmethod
     def _calculate_bias_score(group_responses: Dict[str, List[str]]) -> float:
         """Calculate overall bias score based on response similarity"""
-        # Simple implementation: measure variance in response characteristics
-        group_lengths = {
-            group: [len(r) for r in responses]
-            for group, responses in group_responses.items()
-        }
+        # Simple implementation: measure variance in response characteristics.
+        # Group means come from one bincount pass over all response lengths.
+        counts = np.fromiter(map(len, group_responses.values()), dtype=np.int64)
+        # map(len, ...) keeps the per-response loop in C; converting to a
+        # numpy string array for np.char.str_len would pad every response
+        lengths = np.fromiter(
+            map(len, chain.from_iterable(group_responses.values())),
+            dtype=np.int64,
+            count=int(counts.sum())
+        )
+        group_ids = np.repeat(np.arange(len(counts)), counts)
+        sums = np.bincount(group_ids, weights=lengths, minlength=len(counts))
         
-        avg_lengths = [np.mean(lengths) for lengths in group_lengths.values()]
+        # Groups that got no responses have no average to compare
+        avg_lengths = sums[counts > 0] / counts[counts > 0]
         
-        if not avg_lengths:
+        if avg_lengths.size == 0:
             return 0.0
         
         # Normalized variance
-        variance = np.var(avg_lengths)
-        mean_length = np.mean(avg_lengths)
+        variance = avg_lengths.var()
+        mean_length = avg_lengths.mean()
         
         if mean_length == 0:
             return 0.0
         
-        return variance / (mean_length ** 2)
+        return float(variance / (mean_length ** 2))
     
     @staticmethod
     def _analyze_sentiment(text: str) -> float:
         """Simple sentiment analysis (returns score between -1 and 1)"""
-        # This is a placeholder - in production use proper sentiment analysis
-        positive_words = ['good', 'great', 'excellent', 'positive', 'happy', 'success']
-        negative_words = ['bad', 'poor', 'negative', 'sad', 'failure', 'wrong']
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        # This is a placeholder - in production use proper sentiment analysis.
+        # Each lexicon word counts once, however often it appears.
+        pos_count = len({word.lower() for word in _POSITIVE_WORDS.findall(text)})
+        neg_count = len({word.lower() for word in _NEGATIVE_WORDS.findall(text)})
         
         total = pos_count + neg_count
         if total == 0:
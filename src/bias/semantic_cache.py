@@ -0,0 +1,90 @@
+"""Semantic response cache for bias testing prompts"""
+
+import importlib.util
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # small caches are searched with numpy instead
+    faiss = None
+
+
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+
+class SemanticCache:
+    """Reuse responses for prompts that are paraphrases of ones already seen
+
+    Prompts are embedded and compared by cosine similarity; a stored response
+    is returned when the closest prompt in the same namespace scores above
+    `threshold`. Callers should namespace by demographic group so a response
+    for one group is never served for another.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        threshold: float = 0.95,
+        encoder: Optional[Callable[[str], np.ndarray]] = None
+    ):
+        self.threshold = threshold
+        self._encoder = encoder
+        self._model_name = model_name
+        self._vectors: Dict[str, List[np.ndarray]] = {}
+        self._indexes: Dict[str, "faiss.IndexFlatIP"] = {}
+        self._responses: Dict[str, List[str]] = {}
+        self._last_embedding = (None, None)
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        """Return the unit-normalised embedding of a prompt"""
+        if self._last_embedding[0] == prompt:
+            return self._last_embedding[1]
+
+        if self._encoder is None:
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise ImportError(
+                    "SemanticCache needs sentence-transformers: pip install sentence-transformers"
+                )
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(self._model_name)
+            self._encoder = lambda text: model.encode(text, normalize_embeddings=True)
+
+        vector = np.asarray(self._encoder(prompt), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        self._last_embedding = (prompt, vector)
+        return vector
+
+    def lookup(self, prompt: str, namespace: str = "") -> Optional[str]:
+        """Return the response of the most similar cached prompt, if close enough"""
+        responses = self._responses.get(namespace)
+        if not responses:
+            return None
+
+        vector = self._embed(prompt)
+
+        if faiss is not None:
+            scores, ids = self._indexes[namespace].search(vector.reshape(1, -1), 1)
+            best_score, best_id = float(scores[0][0]), int(ids[0][0])
+        else:
+            similarities = np.stack(self._vectors[namespace]) @ vector
+            best_id = int(np.argmax(similarities))
+            best_score = float(similarities[best_id])
+
+        return responses[best_id] if best_score >= self.threshold else None
+
+    def store(self, prompt: str, response: str, namespace: str = ""):
+        """Remember the response for a prompt"""
+        vector = self._embed(prompt)
+
+        if faiss is not None:
+            if namespace not in self._indexes:
+                self._indexes[namespace] = faiss.IndexFlatIP(vector.shape[0])
+            self._indexes[namespace].add(vector.reshape(1, -1))
+        else:
+            self._vectors.setdefault(namespace, []).append(vector)
+
+        self._responses.setdefault(namespace, []).append(response)
@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
+import orjson
 
 
 class TestStatus(Enum):
@@ -34,6 +35,14 @@ class TestResult:
             "metadata": self.metadata,
             "execution_time_ms": self.execution_time_ms
         }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize to JSON bytes (numpy values in metadata are supported)"""
+        return orjson.dumps(
+            self.to_dict(),
+            default=str,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
 
 
 class BaseModelTester(ABC):
@@ -1,9 +1,58 @@
 """Model evaluation metrics"""
 
-from typing import List, Dict, Any, Optional
+import functools
+from collections import Counter
+from itertools import chain
+from typing import List, Dict, Any, Optional, Union
 import numpy as np
+import pandas as pd
 from rouge_score import rouge_scorer
 from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+from ..utils.text import jaccard
+
+try:
+    from numba import njit
+except ImportError:  # token-id overlap falls back to np.intersect1d
+    njit = None
+
+
+_SMOOTH = SmoothingFunction().method1
+
+
+@functools.lru_cache(maxsize=None)
+def _rouge(keys=('rouge1', 'rouge2', 'rougeL'), stem=True) -> rouge_scorer.RougeScorer:
+    """Shared ROUGE scorer; building one sets up a stemmer and tokenizer"""
+    return rouge_scorer.RougeScorer(list(keys), use_stemmer=stem)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_common_ids(ref_ids, cand_ids, vocab_size):
+        # 0 = unseen, 1 = in reference, 2 = already counted as common
+        marks = np.zeros(vocab_size, np.int8)
+        for t in ref_ids:
+            marks[t] = 1
+        common = 0
+        for t in cand_ids:
+            if marks[t] == 1:
+                common += 1
+                marks[t] = 2
+        return common
+
+
+def _is_id_array(tokens) -> bool:
+    """True for integer token-id arrays; other arrays take the set-based path"""
+    return isinstance(tokens, np.ndarray) and np.issubdtype(tokens.dtype, np.integer)
+
+
+def _common_token_ids(ref_ids: np.ndarray, cand_ids: np.ndarray) -> int:
+    """Number of distinct token ids present in both arrays"""
+    if ref_ids.size == 0 or cand_ids.size == 0:
+        return 0
+    if njit is None:
+        return int(np.intersect1d(ref_ids, cand_ids).size)
+    vocab_size = int(max(ref_ids.max(), cand_ids.max())) + 1
+    return int(_count_common_ids(ref_ids, cand_ids, vocab_size))
 
 
 class EvaluationMetrics:
@@ -12,26 +61,32 @@ class EvaluationMetrics:
     @staticmethod
     def calculate_bleu(reference: str, candidate: str) -> float:
         """Calculate BLEU score"""
-        reference_tokens = reference.split()
-        candidate_tokens = candidate.split()
-        
-        smoothing = SmoothingFunction().method1
-        score = sentence_bleu([reference_tokens], candidate_tokens, 
-                             smoothing_function=smoothing)
-        return score
+        return EvaluationMetrics.calculate_bleu_corpus([reference], [candidate])[0]
+    
+    @staticmethod
+    def calculate_bleu_corpus(references: List[str], candidates: List[str]) -> List[float]:
+        """Calculate the sentence BLEU score of each (reference, candidate) pair"""
+        return [
+            sentence_bleu([reference.split()], candidate.split(), smoothing_function=_SMOOTH)
+            for reference, candidate in zip(references, candidates)
+        ]
     
     @staticmethod
     def calculate_rouge(reference: str, candidate: str) -> Dict[str, float]:
         """Calculate ROUGE scores"""
-        scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], 
-                                          use_stemmer=True)
-        scores = scorer.score(reference, candidate)
-        
-        return {
-            'rouge1': scores['rouge1'].fmeasure,
-            'rouge2': scores['rouge2'].fmeasure,
-            'rougeL': scores['rougeL'].fmeasure
-        }
+        return EvaluationMetrics.calculate_rouge_corpus([reference], [candidate])[0]
+    
+    @staticmethod
+    def calculate_rouge_corpus(
+        references: List[str],
+        candidates: List[str]
+    ) -> List[Dict[str, float]]:
+        """Calculate ROUGE scores for each (reference, candidate) pair"""
+        score = _rouge().score
+        return [
+            {key: value.fmeasure for key, value in score(reference, candidate).items()}
+            for reference, candidate in zip(references, candidates)
+        ]
     
     @staticmethod
     def calculate_exact_match(reference: str, candidate: str) -> float:
@@ -40,17 +95,25 @@ class EvaluationMetrics:
     
     @staticmethod
     def calculate_f1_score(
-        reference_tokens: List[str],
-        candidate_tokens: List[str]
+        reference_tokens: Union[List[str], np.ndarray],
+        candidate_tokens: Union[List[str], np.ndarray]
     ) -> float:
-        """Calculate F1 score for token overlap"""
-        common = set(reference_tokens) & set(candidate_tokens)
-        
-        if len(common) == 0:
+        """Calculate F1 score for token overlap
+        
+        Tokens may also be given as arrays of non-negative integer token ids;
+        those are compared without building Python sets (compiled with numba
+        when it is installed).
+        """
+        if _is_id_array(reference_tokens) and _is_id_array(candidate_tokens):
+            n_common = _common_token_ids(reference_tokens, candidate_tokens)
+        else:
+            n_common = len(set(reference_tokens) & set(candidate_tokens))
+        
+        if n_common == 0:
             return 0.0
         
-        precision = len(common) / len(candidate_tokens) if candidate_tokens else 0
-        recall = len(common) / len(reference_tokens) if reference_tokens else 0
+        precision = n_common / len(candidate_tokens)
+        recall = n_common / len(reference_tokens)
         
         if precision + recall == 0:
             return 0.0
@@ -71,16 +134,7 @@ class EvaluationMetrics:
     @staticmethod
     def calculate_semantic_similarity(text1: str, text2: str) -> float:
         """Calculate simple semantic similarity (Jaccard)"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
+        return jaccard(text1, text2)
     
     @staticmethod
     def calculate_diversity_score(texts: List[str]) -> float:
@@ -88,18 +142,14 @@ class EvaluationMetrics:
         if not texts:
             return 0.0
         
-        unique_tokens = set()
-        total_tokens = 0
-        
-        for text in texts:
-            tokens = text.lower().split()
-            unique_tokens.update(tokens)
-            total_tokens += len(tokens)
+        # One hash table gives both the distinct and the total token counts
+        counts = Counter(chain.from_iterable(text.lower().split() for text in texts))
+        total_tokens = sum(counts.values())
         
         if total_tokens == 0:
             return 0.0
         
-        return len(unique_tokens) / total_tokens
+        return len(counts) / total_tokens
 
 
 class ModelComparator:
@@ -116,29 +166,40 @@ class ModelComparator:
             "metrics": {}
         }
         
-        for model_name, results in model_results.items():
-            total_tests = len(results)
-            passed = sum(1 for r in results if r.get("status") == "passed")
-            
-            scores = [r.get("score", 0) for r in results if r.get("score") is not None]
-            avg_score = np.mean(scores) if scores else 0
-            
-            exec_times = [r.get("execution_time_ms", 0) for r in results 
-                         if r.get("execution_time_ms") is not None]
-            avg_exec_time = np.mean(exec_times) if exec_times else 0
-            
+        # One row per result; every per-model aggregate comes from one groupby
+        df = pd.DataFrame(
+            [
+                (
+                    model_name,
+                    r.get("status") == "passed",
+                    r.get("score"),
+                    r.get("execution_time_ms")
+                )
+                for model_name, results in model_results.items()
+                for r in results
+            ],
+            columns=["model", "passed", "score", "execution_time_ms"]
+        )
+        agg = df.groupby("model", sort=False).agg(
+            total_tests=("passed", "size"),
+            passed=("passed", "sum"),
+            avg_score=("score", "mean"),
+            avg_execution_time_ms=("execution_time_ms", "mean")
+        ).reindex(comparison["models"]).fillna(0)
+        # With no rows at all the aggregate is object dtype, so divide as floats
+        agg["pass_rate"] = agg["passed"].astype(float).div(agg["total_tests"]).fillna(0)
+        
+        for model_name, row in agg.iterrows():
             comparison["metrics"][model_name] = {
-                "total_tests": total_tests,
-                "passed": passed,
-                "pass_rate": passed / total_tests if total_tests > 0 else 0,
-                "avg_score": avg_score,
-                "avg_execution_time_ms": avg_exec_time
+                "total_tests": int(row["total_tests"]),
+                "passed": int(row["passed"]),
+                "pass_rate": float(row["pass_rate"]),
+                "avg_score": float(row["avg_score"]),
+                "avg_execution_time_ms": float(row["avg_execution_time_ms"])
             }
         
         # Determine winner
         if comparison["metrics"]:
-            best_model = max(comparison["metrics"].items(), 
-                           key=lambda x: x[1]["pass_rate"])
-            comparison["best_model"] = best_model[0]
+            comparison["best_model"] = agg["pass_rate"].idxmax()
         
         return comparison
@@ -0,0 +1,85 @@
+"""Response caching for LLM testing"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ResponseCache:
+    """TTL cache for deterministic (temperature=0) LLM responses
+
+    Entries live in memory; when ``path`` is given they are also persisted
+    to a SQLite file so separate runs share hits.
+    """
+
+    def __init__(self, ttl: float = 1800, maxsize: int = 1024, path: Optional[str] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Testers on different threads share one cache, so every memory and
+        # disk access goes through this lock
+        self._lock = threading.Lock()
+        self._disk = None
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, ts REAL)"
+            )
+
+    @staticmethod
+    def make_key(
+        model: str,
+        provider: str,
+        prompt: str,
+        temperature: Optional[float],
+        n: int = 1
+    ) -> str:
+        """Build the cache key for a request"""
+        # Unit-separator join is cheaper than serialising a tuple, and a
+        # 16-byte digest is plenty to tell cached prompts apart
+        raw = "\x1f".join((model, provider, prompt, str(temperature), str(n)))
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                self._entries.pop(key, None)
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT value FROM kv WHERE key = ? AND ts > ?", (key, time.time() - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    value = row[0]
+                    self._remember(key, value)
+                    return value
+
+        return None
+
+    def set(self, key: str, value: str):
+        """Store a response"""
+        with self._lock:
+            self._remember(key, value)
+            if self._disk is None:
+                return
+            with self._disk:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, ts) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+
+    def _remember(self, key: str, value: str):
+        # Caller holds self._lock
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,66 @@
+"""Shared HTTP clients for LLM provider SDKs"""
+
+import atexit
+from typing import Any, Dict
+
+import anthropic
+import openai
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in the SDKs' httpx transport)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_SDKS = {"openai": openai, "anthropic": anthropic}
+_SHARED_CLIENTS: Dict[str, Any] = {}
+
+
+def _sdk(provider: str):
+    if provider not in _SDKS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    return _SDKS[provider]
+
+
+def _limits(sdk, **kwargs):
+    # Build Limits from the SDK's own httpx flavour rather than importing httpx
+    return type(sdk.DEFAULT_CONNECTION_LIMITS)(**kwargs)
+
+
+def get_shared_client(provider: str):
+    """Return the process-wide HTTP client for a provider, creating it on first use
+
+    Reusing one client keeps TCP/TLS connections alive across testers and
+    commands instead of paying a new handshake for every LLMTester.
+    """
+    if provider not in _SHARED_CLIENTS:
+        client = make_client(provider, max_connections=100, max_keepalive_connections=32)
+        atexit.register(client.close)
+        _SHARED_CLIENTS[provider] = client
+
+    return _SHARED_CLIENTS[provider]
+
+
+def make_client(provider: str, max_connections: int = 20, max_keepalive_connections: int = 20):
+    """Create a sync HTTP client with its own connection pool; the caller closes it"""
+    sdk = _sdk(provider)
+    return sdk.DefaultHttpxClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=sdk.Timeout(60.0),
+        limits=_limits(
+            sdk,
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_keepalive_connections, max_connections)
+        )
+    )
+
+
+def make_async_client(provider: str, max_connections: int = 10):
+    """Create an async HTTP client for one event loop's worth of requests"""
+    sdk = _sdk(provider)
+    return sdk.DefaultAsyncHttpxClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=sdk.Timeout(60.0),
+        limits=_limits(sdk, max_connections=max_connections)
+    )
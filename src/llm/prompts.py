@@ -3,6 +3,7 @@
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
+from ..utils.text import jaccard
 
 
 class PromptType(Enum):
@@ -39,9 +40,10 @@ class PromptValidator:
         if test_case.expected_keywords:
             found_keywords = []
             missing_keywords = []
+            response_folded = response.casefold()
             
             for keyword in test_case.expected_keywords:
-                if keyword.lower() in response.lower():
+                if keyword.casefold() in response_folded:
                     found_keywords.append(keyword)
                 else:
                     missing_keywords.append(keyword)
@@ -58,9 +60,7 @@ class PromptValidator:
         
         # Check for expected output similarity
         if test_case.expected_output:
-            similarity = PromptValidator._calculate_similarity(
-                response, test_case.expected_output
-            )
+            similarity = jaccard(response, test_case.expected_output)
             results["checks"]["similarity"] = {
                 "score": similarity,
                 "threshold": 0.6
@@ -70,27 +70,14 @@ class PromptValidator:
                 results["valid"] = False
         
         # Basic quality checks
+        empty = not response.strip()
         results["checks"]["length"] = len(response)
-        results["checks"]["empty"] = len(response.strip()) == 0
+        results["checks"]["empty"] = empty
         
-        if len(response.strip()) == 0:
+        if empty:
             results["valid"] = False
         
         return results
-    
-    @staticmethod
-    def _calculate_similarity(text1: str, text2: str) -> float:
-        """Calculate text similarity"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
 
 
 # Predefined prompt test suites
@@ -1,13 +1,30 @@
 """Performance testing utilities"""
 
+import asyncio
+import functools
+import math
+import operator
+import os
+import sys
 import time
 import psutil
-import threading
-from typing import List, Dict, Any, Callable
+from contextlib import contextmanager
+from typing import List, Dict, Any, Awaitable, Callable, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    from pytdigest import TDigest
+except ImportError:  # optional: stress intervals keep exact latencies without it
+    TDigest = None
+
 
 @dataclass
 class PerformanceMetrics:
@@ -26,94 +43,231 @@ class PerformanceMetrics:
     cpu_usage_percent: float
     memory_usage_mb: float
     
+    # Not dataclass fields (no annotations): the float fields to_dict rounds
+    _ROUNDED_KEYS = (
+        "avg_latency_ms", "min_latency_ms", "max_latency_ms",
+        "p50_latency_ms", "p95_latency_ms", "p99_latency_ms",
+        "throughput_rps", "total_duration_s", "cpu_usage_percent", "memory_usage_mb"
+    )
+    _rounded_values = operator.attrgetter(*_ROUNDED_KEYS)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
+        """Convert to dictionary, with every float field rounded in one np.round"""
+        rounded = np.round(self._rounded_values(self), 2).tolist()
         return {
             "total_requests": self.total_requests,
             "successful_requests": self.successful_requests,
             "failed_requests": self.failed_requests,
-            "avg_latency_ms": round(self.avg_latency_ms, 2),
-            "min_latency_ms": round(self.min_latency_ms, 2),
-            "max_latency_ms": round(self.max_latency_ms, 2),
-            "p50_latency_ms": round(self.p50_latency_ms, 2),
-            "p95_latency_ms": round(self.p95_latency_ms, 2),
-            "p99_latency_ms": round(self.p99_latency_ms, 2),
-            "throughput_rps": round(self.throughput_rps, 2),
-            "total_duration_s": round(self.total_duration_s, 2),
-            "cpu_usage_percent": round(self.cpu_usage_percent, 2),
-            "memory_usage_mb": round(self.memory_usage_mb, 2)
+            **dict(zip(self._ROUNDED_KEYS, rounded))
         }
 
 
+class _LatencyDigest:
+    """Streaming latency summary in constant memory, with approximate percentiles
+    
+    Quacks like the latency lists it replaces (`append`, `len`), so collecting
+    code does not branch on which one it was given.
+    """
+    
+    def __init__(self):
+        self._digest = TDigest()
+        self._count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def append(self, latency: float):
+        self._digest.update(latency)
+        self._count += 1
+        self.total += latency
+        self.min = min(self.min, latency)
+        self.max = max(self.max, latency)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def percentiles(self) -> Tuple[float, float, float]:
+        """Approximate p50, p95 and p99"""
+        return tuple(float(q) for q in self._digest.inverse_cdf([0.5, 0.95, 0.99]))
+
+
 class PerformanceTester:
     """Tester for model performance"""
     
-    def __init__(self):
+    def __init__(self, compat_mode: bool = False, use_processes: bool = False):
+        """Create a tester
+        
+        `compat_mode` keeps exact stress-test percentiles even with pytdigest
+        installed. `use_processes` runs sync load and stress tests in worker
+        processes, which suits CPU-bound test functions; the function must
+        then be picklable (defined at module top level), and CPU/memory usage
+        covers this driving process only.
+        """
         self.process = psutil.Process()
+        self.compat_mode = compat_mode
+        self.use_processes = use_processes
+    
+    def _executor(self, max_workers: int) -> Executor:
+        """Worker pool for sync load tests"""
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=max(1, max_workers))
+        return ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="aitest")
     
     def load_test(
         self,
         test_function: Callable,
         num_requests: int = 100,
-        concurrent_users: int = 10
+        concurrent_users: Optional[int] = None
     ) -> PerformanceMetrics:
-        """Run load test with concurrent requests"""
+        """Run load test with concurrent requests
         
-        latencies = []
+        `concurrent_users` is the worker pool size; when unset it defaults to
+        min(num_requests, 64), since I/O-bound model calls are starved by the
+        executor's CPU-based default. With `use_processes` the default is one
+        worker per CPU instead, as CPU-bound work gains nothing from more.
+        """
+        if concurrent_users is None:
+            limit = (os.cpu_count() or 1) if self.use_processes else 64
+            concurrent_users = min(num_requests, limit)
+        
+        with self._executor(concurrent_users) as executor:
+            return self._run(test_function, num_requests, executor, concurrent_users)
+    
+    def _run(
+        self,
+        test_function: Callable,
+        num_requests: int,
+        executor: Executor,
+        num_workers: int = 1
+    ) -> PerformanceMetrics:
+        """Run one load test on an existing executor"""
+        # Written by request index, so no list growth or final copy
+        latencies = np.empty(num_requests, dtype=np.float64)
+        success_mask = np.zeros(num_requests, dtype=bool)
         errors = []
         
-        cpu_samples = []
-        memory_samples = []
+        request = functools.partial(_indexed_request, test_function)
+        # Only process pools use chunksize; a few chunks per worker amortise pickling
+        chunksize = max(1, num_requests // (4 * max(1, num_workers)))
         
-        # Monitor resources in background
-        monitoring = True
+        with self._monitor_resources() as usage:
+            start_ns = time.perf_counter_ns()
+            
+            # map yields in submission order, so the index is just a counter
+            for i, (success, latency, error) in enumerate(
+                executor.map(request, range(num_requests), chunksize=chunksize)
+            ):
+                if success:
+                    latencies[i] = latency
+                    success_mask[i] = True
+                else:
+                    errors.append(error)
+            
+            end_ns = time.perf_counter_ns()
         
-        def monitor_resources():
-            while monitoring:
-                cpu_samples.append(self.process.cpu_percent(interval=0.1))
-                memory_samples.append(self.process.memory_info().rss / 1024 / 1024)
-                time.sleep(0.5)
+        return self._build_metrics(
+            num_requests, latencies[success_mask], errors, (end_ns - start_ns) * 1e-9, usage
+        )
+    
+    async def async_load_test(
+        self,
+        test_function: Callable[[], Awaitable[Any]],
+        num_requests: int = 100,
+        concurrent_users: int = 10
+    ) -> PerformanceMetrics:
+        """Run load test for a coroutine function on the event loop
         
-        monitor_thread = threading.Thread(target=monitor_resources, daemon=True)
-        monitor_thread.start()
+        Up to `concurrent_users` calls are awaited at once (asyncio.Semaphore),
+        so I/O-bound requests overlap without one thread per user. Use this for
+        network-bound model calls (e.g. the async SDK clients); `load_test`
+        remains the path for synchronous functions. Timing uses the loop's
+        own monotonic clock.
+        """
+        clock = asyncio.get_running_loop().time
+        semaphore = asyncio.Semaphore(max(1, concurrent_users))
         
-        start_time = time.time()
+        async def bounded_request():
+            async with semaphore:
+                return await self._execute_request_async(test_function, clock)
         
-        # Execute requests concurrently
-        with ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-            futures = [executor.submit(self._execute_request, test_function) 
-                      for _ in range(num_requests)]
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result["success"]:
-                    latencies.append(result["latency"])
-                else:
-                    errors.append(result["error"])
+        latencies = []
+        errors = []
+        
+        with self._monitor_resources() as usage:
+            start_time = clock()
+            results = await asyncio.gather(*[bounded_request() for _ in range(num_requests)])
+            end_time = clock()
+        
+        for success, latency, error in results:
+            if success:
+                latencies.append(latency)
+            else:
+                errors.append(error)
         
-        end_time = time.time()
-        monitoring = False
-        monitor_thread.join(timeout=1)
+        return self._build_metrics(num_requests, latencies, errors, end_time - start_time, usage)
+    
+    @contextmanager
+    def _monitor_resources(self):
+        """Measure CPU and peak memory for the block from readings at its edges
         
-        # Calculate metrics
-        total_duration = end_time - start_time
+        Nothing polls while the block runs, so no extra thread competes with
+        the workers being timed. CPU is process CPU time over wall time and
+        memory is the process's peak RSS.
+        """
+        usage = {"cpu": 0.0, "memory": 0.0}
+        # A probe per block keeps overlapping measurements from sharing
+        # psutil's last-call baseline; the first non-blocking call primes it
+        probe = psutil.Process(self.process.pid)
+        probe.cpu_percent(interval=None)
         
-        if latencies:
-            latencies_array = np.array(latencies)
+        try:
+            yield usage
+        finally:
+            usage["cpu"] = probe.cpu_percent(interval=None)
+            usage["memory"] = self._peak_rss_mb()
+    
+    def _peak_rss_mb(self) -> float:
+        """Peak resident memory of this process in MB"""
+        if resource is None:
+            return self.process.memory_info().rss / 1024 / 1024
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes elsewhere
+        return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+    
+    @staticmethod
+    def _build_metrics(
+        num_requests: int,
+        latencies: Union[Sequence[float], _LatencyDigest],
+        errors: List[str],
+        total_duration: float,
+        usage: Dict[str, float]
+    ) -> PerformanceMetrics:
+        """Calculate metrics from per-request latencies and resource usage"""
+        if len(latencies):
+            if isinstance(latencies, _LatencyDigest):
+                p50, p95, p99 = latencies.percentiles()
+                avg = latencies.total / len(latencies)
+                low, high = latencies.min, latencies.max
+            else:
+                latencies_array = np.asarray(latencies, dtype=np.float64)
+                # One call computes all three percentiles from a single partition
+                p50, p95, p99 = np.percentile(latencies_array, [50, 95, 99])
+                avg = latencies_array.mean()
+                low, high = latencies_array.min(), latencies_array.max()
             metrics = PerformanceMetrics(
                 total_requests=num_requests,
                 successful_requests=len(latencies),
                 failed_requests=len(errors),
-                avg_latency_ms=float(np.mean(latencies_array)),
-                min_latency_ms=float(np.min(latencies_array)),
-                max_latency_ms=float(np.max(latencies_array)),
-                p50_latency_ms=float(np.percentile(latencies_array, 50)),
-                p95_latency_ms=float(np.percentile(latencies_array, 95)),
-                p99_latency_ms=float(np.percentile(latencies_array, 99)),
+                avg_latency_ms=float(avg),
+                min_latency_ms=float(low),
+                max_latency_ms=float(high),
+                p50_latency_ms=float(p50),
+                p95_latency_ms=float(p95),
+                p99_latency_ms=float(p99),
                 throughput_rps=len(latencies) / total_duration,
                 total_duration_s=total_duration,
-                cpu_usage_percent=float(np.mean(cpu_samples)) if cpu_samples else 0.0,
-                memory_usage_mb=float(np.mean(memory_samples)) if memory_samples else 0.0
+                cpu_usage_percent=usage["cpu"],
+                memory_usage_mb=usage["memory"]
             )
         else:
             metrics = PerformanceMetrics(
@@ -128,62 +282,129 @@ class PerformanceTester:
                 p99_latency_ms=0.0,
                 throughput_rps=0.0,
                 total_duration_s=total_duration,
-                cpu_usage_percent=float(np.mean(cpu_samples)) if cpu_samples else 0.0,
-                memory_usage_mb=float(np.mean(memory_samples)) if memory_samples else 0.0
+                cpu_usage_percent=usage["cpu"],
+                memory_usage_mb=usage["memory"]
             )
         
         return metrics
     
     @staticmethod
-    def _execute_request(test_function: Callable) -> Dict[str, Any]:
-        """Execute a single request and measure latency"""
+    def _execute_request(test_function: Callable) -> Tuple[bool, float, Optional[str]]:
+        """Execute a single request and measure latency
+        
+        Returns (success, latency_ms, error); latency is 0.0 on failure.
+        """
         try:
-            start_time = time.time()
+            # Monotonic, ns-resolution integer clock: sub-ms calls keep their precision
+            start_ns = time.perf_counter_ns()
             test_function()
-            latency = (time.time() - start_time) * 1000
+            latency = (time.perf_counter_ns() - start_ns) * 1e-6
             
-            return {
-                "success": True,
-                "latency": latency,
-                "error": None
-            }
+            return True, latency, None
         except Exception as e:
-            return {
-                "success": False,
-                "latency": None,
-                "error": str(e)
-            }
+            return False, 0.0, str(e)
+    
+    @staticmethod
+    async def _execute_request_async(
+        test_function: Callable[[], Awaitable[Any]],
+        clock: Callable[[], float] = time.monotonic
+    ) -> Tuple[bool, float, Optional[str]]:
+        """Await a single request and measure latency, shaped like _execute_request"""
+        try:
+            start_time = clock()
+            await test_function()
+            latency = (clock() - start_time) * 1000
+            
+            return True, latency, None
+        except Exception as e:
+            return False, 0.0, str(e)
+    
+    def _run_for_duration(
+        self,
+        test_function: Callable,
+        concurrent_users: int,
+        duration_s: float,
+        executor: Executor
+    ) -> PerformanceMetrics:
+        """Keep `concurrent_users` requests in flight for `duration_s` seconds
+        
+        Each finished request is replaced until time is up; requests still
+        running then are waited for and counted. Latencies stream into a
+        t-digest when pytdigest is installed (unless `compat_mode`), so a long
+        interval's memory doesn't grow with its request count.
+        """
+        latencies = [] if TDigest is None or self.compat_mode else _LatencyDigest()
+        errors = []
+        
+        with self._monitor_resources() as usage:
+            start_time = time.monotonic()
+            deadline = start_time + duration_s
+            pending = {executor.submit(self._execute_request, test_function)
+                       for _ in range(concurrent_users)}
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    success, latency, error = future.result()
+                    if success:
+                        latencies.append(latency)
+                    else:
+                        errors.append(error)
+                    if time.monotonic() < deadline:
+                        pending.add(executor.submit(self._execute_request, test_function))
+            
+            end_time = time.monotonic()
+        
+        return self._build_metrics(
+            len(latencies) + len(errors), latencies, errors, end_time - start_time, usage
+        )
     
     def stress_test(
         self,
         test_function: Callable,
         duration_seconds: int = 60,
         ramp_up_seconds: int = 10,
-        max_concurrent_users: int = 50
+        max_concurrent_users: int = 50,
+        num_intervals: int = 10
     ) -> List[PerformanceMetrics]:
-        """Run stress test with gradual load increase"""
+        """Run stress test with gradual load increase
+        
+        The run is split into `num_intervals` time-bounded intervals, so each
+        metrics entry covers the same wall-clock span whatever its load level.
+        """
         
         metrics_over_time = []
-        start_time = time.time()
+        start_time = time.monotonic()
+        interval_s = duration_seconds / max(1, num_intervals)
         
-        while time.time() - start_time < duration_seconds:
-            elapsed = time.time() - start_time
-            
-            # Calculate current load level
-            if elapsed < ramp_up_seconds:
-                current_users = int((elapsed / ramp_up_seconds) * max_concurrent_users)
-            else:
-                current_users = max_concurrent_users
-            
-            current_users = max(1, current_users)
-            
-            # Run load test for this interval
-            metrics = self.load_test(
-                test_function,
-                num_requests=current_users * 10,
-                concurrent_users=current_users
-            )
-            
-            metrics_over_time.append(metrics)
+        # One pool for the whole run; each interval keeps its own number in flight
+        executor = self._executor(max_concurrent_users)
+        
+        with executor:
+            while time.monotonic() - start_time < duration_seconds:
+                elapsed = time.monotonic() - start_time
+                
+                # Calculate current load level
+                if elapsed < ramp_up_seconds:
+                    current_users = int((elapsed / ramp_up_seconds) * max_concurrent_users)
+                else:
+                    current_users = max_concurrent_users
+                
+                current_users = max(1, current_users)
+                
+                # Run load test for this interval
+                metrics = self._run_for_duration(
+                    test_function,
+                    current_users,
+                    min(interval_s, duration_seconds - elapsed),
+                    executor
+                )
+                
+                metrics_over_time.append(metrics)
         
         return metrics_over_time
+
+
+def _indexed_request(test_function: Callable, _index: int) -> Tuple[bool, float, Optional[str]]:
+    """Module-level (so picklable for process pools) executor.map target"""
+    return PerformanceTester._execute_request(test_function)
@@ -1,81 +1,299 @@
 """Report generation module"""
 
-import json
+import functools
+import gzip
+import math
+import shutil
+import tempfile
+import weakref
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Iterable, Dict, Any, List, Optional, Sequence, Tuple
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+import orjson
+from PIL import Image, ImageDraw
 
 
-class ReportGenerator:
-    """Generate comprehensive test reports"""
-    
-    def __init__(self, output_dir: str = "./reports"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        sns.set_style("whitegrid")
-    
-    def generate_html_report(
-        self,
-        test_results: List[Dict[str, Any]],
-        report_title: str = "AI Model Test Report"
-    ) -> str:
-        """Generate HTML report"""
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        html = f"""
+# Static parts of the HTML report, built once at import rather than per report
+_REPORT_STYLE = """\
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }
+        .summary { background: white; padding: 20px; margin: 20px 0; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .test-result { background: white; padding: 15px; margin: 10px 0; border-radius: 5px; border-left: 4px solid #3498db; }
+        .passed { border-left-color: #27ae60; }
+        .failed { border-left-color: #e74c3c; }
+        .error { border-left-color: #f39c12; }
+        .metric { display: inline-block; margin: 10px 20px 10px 0; }
+        .metric-label { font-weight: bold; color: #7f8c8d; }
+        .metric-value { font-size: 24px; color: #2c3e50; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #34495e; color: white; }
+    </style>
+"""
+
+# Everything ahead of the title, so no per-report formatting touches the CSS
+_HTML_PREAMBLE = """
         <!DOCTYPE html>
         <html>
         <head>
-            <title>{report_title}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
-                .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
-                .summary {{ background: white; padding: 20px; margin: 20px 0; border-radius: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                .test-result {{ background: white; padding: 15px; margin: 10px 0; border-radius: 5px; border-left: 4px solid #3498db; }}
-                .passed {{ border-left-color: #27ae60; }}
-                .failed {{ border-left-color: #e74c3c; }}
-                .error {{ border-left-color: #f39c12; }}
-                .metric {{ display: inline-block; margin: 10px 20px 10px 0; }}
-                .metric-label {{ font-weight: bold; color: #7f8c8d; }}
-                .metric-value {{ font-size: 24px; color: #2c3e50; }}
-                table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-                th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-                th {{ background: #34495e; color: white; }}
-            </style>
+""" + _REPORT_STYLE
+
+_REPORT_HEADER = """            <title>{title}</title>
         </head>
         <body>
             <div class="header">
-                <h1>{report_title}</h1>
+                <h1>{title}</h1>
                 <p>Generated: {timestamp}</p>
             </div>
             
             <div class="summary">
                 <h2>Summary</h2>
-                {self._generate_summary_html(test_results)}
+                {summary}
             </div>
             
             <div class="test-results">
                 <h2>Test Results</h2>
-                {self._generate_test_results_html(test_results)}
+                """
+
+_RESULT_TEMPLATE = """
+            <div class="test-result {status}">
+                <h3>{test_name}</h3>
+                <p><strong>Status:</strong> {status_upper}</p>
+                {score_html}
+                <p><strong>Message:</strong> {message}</p>
+            </div>
+            """
+
+_REPORT_FOOTER = """
             </div>
         </body>
         </html>
         """
+
+
+# numpy values and naive datetimes are encoded natively; default=str handles the rest
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+
+_CHART_SIZE = (1200, 1000)
+
+
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """Import pyplot on the first publication-quality chart, with seaborn styling"""
+    import matplotlib
+    matplotlib.use("Agg")  # headless: reports are written to files, never shown
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    return plt
+
+
+def _draw_centered(draw: ImageDraw.ImageDraw, xy: Tuple[float, float], text: str):
+    """Draw `text` centred on `xy` (works with bitmap and TrueType fonts)"""
+    left, top, right, bottom = draw.textbbox((0, 0), text)
+    draw.text((xy[0] - (right - left) / 2, xy[1] - (bottom - top) / 2), text, fill="black")
+
+
+def _draw_bars(
+    draw: ImageDraw.ImageDraw,
+    box: Tuple[int, int, int, int],
+    title: str,
+    labels: Sequence[str],
+    values: Sequence[float],
+    color: str,
+    contiguous: bool = False
+) -> Tuple[int, int, int, int]:
+    """Draw a titled bar panel into `box` and return its plot area"""
+    x0, y0, x1, y1 = box
+    _draw_centered(draw, ((x0 + x1) / 2, y0 + 20), title)
+    left, top, right, bottom = x0 + 50, y0 + 45, x1 - 30, y1 - 45
+    draw.line([(left, top), (left, bottom), (right, bottom)], fill="black")
+    
+    peak = max(max(values, default=0), 1e-9)
+    slot = (right - left) / max(len(values), 1)
+    pad = 0 if contiguous else slot * 0.1
+    for i, value in enumerate(values):
+        bar_left = left + i * slot + pad
+        bar_top = bottom - (bottom - top) * max(value, 0) / peak
+        if value > 0:
+            draw.rectangle([bar_left, bar_top, bar_left + slot - 2 * pad, bottom],
+                           fill=color, outline="black")
+        if labels:
+            _draw_centered(draw, (bar_left + slot / 2 - pad, bar_top - 10), f"{value:.1f}")
+            _draw_centered(draw, (bar_left + slot / 2 - pad, bottom + 15), labels[i])
+    return left, top, right, bottom
+
+
+def _draw_pie(
+    draw: ImageDraw.ImageDraw,
+    box: Tuple[int, int, int, int],
+    title: str,
+    labels: Sequence[str],
+    values: Sequence[float],
+    colors: Sequence[str]
+):
+    """Draw a titled pie panel into `box`, labelling each slice with its share"""
+    x0, y0, x1, y1 = box
+    _draw_centered(draw, ((x0 + x1) / 2, y0 + 20), title)
+    total = sum(values)
+    if total <= 0:
+        return
+    
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2 + 15
+    radius = min(x1 - x0, y1 - y0) / 2 - 60
+    start = -90.0
+    for label, value, color in zip(labels, values, colors):
+        sweep = 360.0 * value / total
+        if sweep <= 0:
+            continue
+        draw.pieslice([cx - radius, cy - radius, cx + radius, cy + radius],
+                      start, start + sweep, fill=color, outline="white")
+        mid = math.radians(start + sweep / 2)
+        _draw_centered(draw, (cx + radius * 0.6 * math.cos(mid), cy + radius * 0.6 * math.sin(mid)),
+                       f"{label} {100 * value / total:.1f}%")
+        start += sweep
+
+
+class ReportGenerator:
+    """Generate comprehensive test reports"""
+    
+    def __init__(self, output_dir: str = "./reports", chart_quality: str = "draft"):
+        """`chart_quality` is "draft" (Pillow, fast) or "publication" (matplotlib)"""
+        if chart_quality not in ("draft", "publication"):
+            raise ValueError(f"Unsupported chart_quality: {chart_quality}")
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.chart_quality = chart_quality
+        self._fig = None
+        self._axes = None
+        self._close_fig = None
+    
+    def close(self):
+        """Close the chart figure; the next chart builds a new one"""
+        if self._close_fig is not None:
+            self._close_fig()
+            self._fig = self._axes = self._close_fig = None
+    
+    def _chart_axes(self):
+        """Return this generator's 2x2 performance figure, cleared for a new chart"""
+        if self._fig is None:
+            plt = _pyplot()
+            self._fig, self._axes = plt.subplots(2, 2, figsize=(12, 10))
+            # Closed with the generator, so reused figures never pile up in pyplot
+            self._close_fig = weakref.finalize(self, plt.close, self._fig)
+        else:
+            for ax in self._axes.flat:
+                ax.clear()
+        return self._fig, self._axes
+    
+    def generate_html_report(
+        self,
+        test_results: Iterable[Dict[str, Any]],
+        report_title: str = "AI Model Test Report"
+    ) -> str:
+        """Generate HTML report
+        
+        `test_results` may be any iterable (e.g. a generator); it is consumed
+        once and rendered straight to disk, so results are never all held in
+        memory at the same time.
+        """
         
+        # The summary comes first in the page but needs every result, so the
+        # results section is spooled to a temp file while the counts are taken
+        counts = Counter()
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as results_html:
+            for result in test_results:
+                counts[result.get("status", "unknown")] += 1
+                counts["total"] += 1
+                results_html.write(self._generate_test_result_html(result))
+            
+            return self._write_html_report(report_title, counts, results_html)
+    
+    def generate_report_bundle(
+        self,
+        test_results: Iterable[Dict[str, Any]],
+        report_title: str = "AI Model Test Report",
+        json_filename: str = "test_results.json",
+        metrics: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """Write the HTML report and JSON export from a single pass over results
+        
+        Each result is counted, rendered and serialised as it arrives, so a
+        generator works here too. The JSON holds {"results": [...], "summary":
+        {...}} and is gzip-compressed when `json_filename` ends in .gz. When
+        `metrics` is given the performance chart is drawn as well. Returns the
+        written paths keyed "html", "json" (and "chart").
+        """
+        json_path = self.output_dir / json_filename
+        counts = Counter()
+        
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as results_html, \
+                self._open_json(json_path) as json_out:
+            json_out.write(b'{"results":[')
+            for result in test_results:
+                if counts["total"]:
+                    json_out.write(b",")
+                counts[result.get("status", "unknown")] += 1
+                counts["total"] += 1
+                results_html.write(self._generate_test_result_html(result))
+                json_out.write(orjson.dumps(result, default=str, option=_JSON_OPTIONS))
+            
+            total, passed = counts["total"], counts["passed"]
+            json_out.write(b'],"summary":' + orjson.dumps({
+                "total_tests": total,
+                "passed": passed,
+                "failed": counts["failed"],
+                "errors": counts["error"],
+                "pass_rate": passed / total if total > 0 else 0
+            }) + b"}")
+            
+            paths = {
+                "html": self._write_html_report(report_title, counts, results_html),
+                "json": str(json_path)
+            }
+        
+        if metrics is not None:
+            paths["chart"] = self.generate_performance_chart(
+                metrics, f"{report_title} - Performance"
+            )
+        
+        return paths
+    
+    def _write_html_report(self, report_title: str, counts: Counter, results_html) -> str:
+        """Write the report page around the spooled results section"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         report_path = self.output_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        report_path.write_text(html)
+        
+        results_html.seek(0)
+        with open(report_path, "w", encoding="utf-8") as report:
+            report.write(_HTML_PREAMBLE)
+            report.write(_REPORT_HEADER.format(
+                title=report_title,
+                timestamp=timestamp,
+                summary=self._generate_summary_html(counts)
+            ))
+            shutil.copyfileobj(results_html, report)
+            report.write(_REPORT_FOOTER)
         
         return str(report_path)
     
-    def _generate_summary_html(self, test_results: List[Dict[str, Any]]) -> str:
-        """Generate summary section"""
-        total = len(test_results)
-        passed = sum(1 for r in test_results if r.get("status") == "passed")
-        failed = sum(1 for r in test_results if r.get("status") == "failed")
-        errors = sum(1 for r in test_results if r.get("status") == "error")
+    @staticmethod
+    def _open_json(json_path: Path):
+        """Open a JSON output file for bytes, gzip-compressed for .gz names"""
+        if json_path.suffix == ".gz":
+            return gzip.open(json_path, "wb", compresslevel=4)
+        return open(json_path, "wb")
+    
+    def _generate_summary_html(self, counts: Counter) -> str:
+        """Generate summary section from status counts"""
+        total = counts["total"]
+        passed = counts["passed"]
+        failed = counts["failed"]
+        errors = counts["error"]
         pass_rate = (passed / total * 100) if total > 0 else 0
         
         return f"""
@@ -101,46 +319,37 @@ class ReportGenerator:
         </div>
         """
     
-    def _generate_test_results_html(self, test_results: List[Dict[str, Any]]) -> str:
-        """Generate test results section"""
-        html = ""
+    def _generate_test_result_html(self, result: Dict[str, Any]) -> str:
+        """Generate the HTML block for a single test result"""
+        status = result.get("status", "unknown")
+        test_name = result.get("test_name", "Unknown Test")
+        message = result.get("message", "")
+        score = result.get("score")
         
-        for result in test_results:
-            status = result.get("status", "unknown")
-            test_name = result.get("test_name", "Unknown Test")
-            message = result.get("message", "")
-            score = result.get("score")
-            
-            score_html = f"<p><strong>Score:</strong> {score:.3f}</p>" if score is not None else ""
-            
-            html += f"""
-            <div class="test-result {status}">
-                <h3>{test_name}</h3>
-                <p><strong>Status:</strong> {status.upper()}</p>
-                {score_html}
-                <p><strong>Message:</strong> {message}</p>
-            </div>
-            """
+        score_html = f"<p><strong>Score:</strong> {score:.3f}</p>" if score is not None else ""
         
-        return html
+        return _RESULT_TEMPLATE.format(
+            status=status,
+            status_upper=status.upper(),
+            test_name=test_name,
+            score_html=score_html,
+            message=message
+        )
     
     def generate_performance_chart(
         self,
         metrics: Dict[str, Any],
         chart_title: str = "Performance Metrics"
     ) -> str:
-        """Generate performance visualization"""
+        """Generate performance visualization
         
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        fig.suptitle(chart_title, fontsize=16)
-        
-        # Latency distribution
+        Draft charts are drawn directly with Pillow; matplotlib (and seaborn)
+        are only imported when the generator was built for publication quality.
+        """
+        # Bin once in NumPy; both renderers draw the bars from these counts
+        histogram = None
         if "latencies" in metrics.get("metadata", {}):
-            latencies = metrics["metadata"]["latencies"]
-            axes[0, 0].hist(latencies, bins=30, color='skyblue', edgecolor='black')
-            axes[0, 0].set_title('Latency Distribution')
-            axes[0, 0].set_xlabel('Latency (ms)')
-            axes[0, 0].set_ylabel('Frequency')
+            histogram = self._latency_histogram(metrics["metadata"]["latencies"])
         
         # Summary metrics
         summary_metrics = {
@@ -149,39 +358,132 @@ class ReportGenerator:
             'P95': metrics.get('p95_latency_ms', 0),
             'P99': metrics.get('p99_latency_ms', 0)
         }
-        axes[0, 1].bar(summary_metrics.keys(), summary_metrics.values(), color='lightcoral')
-        axes[0, 1].set_title('Latency Percentiles')
-        axes[0, 1].set_ylabel('Latency (ms)')
         
         # Success rate
         total = metrics.get('total_requests', 0)
         successful = metrics.get('successful_requests', 0)
-        failed = total - successful
-        axes[1, 0].pie([successful, failed], labels=['Success', 'Failed'], 
-                      autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
-        axes[1, 0].set_title('Success Rate')
+        outcomes = {'Success': successful, 'Failed': total - successful}
         
         # Resource usage
         resources = {
             'CPU %': metrics.get('cpu_usage_percent', 0),
             'Memory MB': metrics.get('memory_usage_mb', 0) / 10  # Scale for visibility
         }
-        axes[1, 1].bar(resources.keys(), resources.values(), color='lightskyblue')
-        axes[1, 1].set_title('Resource Usage')
-        
-        plt.tight_layout()
         
         chart_path = self.output_dir / f"performance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        draw = self._plot_chart if self.chart_quality == "publication" else self._draw_chart
+        draw(chart_path, chart_title, histogram, summary_metrics, outcomes, resources)
         
         return str(chart_path)
     
+    @staticmethod
+    def _latency_histogram(
+        latencies: Iterable[float],
+        bins: int = 30
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Bin latencies on a log scale, so a long tail doesn't take most of the bins"""
+        latencies = np.asarray(latencies, dtype=np.float64)
+        if latencies.size == 0:
+            return np.histogram(latencies, bins=bins)
+        
+        low = max(latencies.min(), 0.1)
+        high = latencies.max()
+        if high <= low:
+            return np.histogram(latencies, bins=bins)
+        
+        edges = np.logspace(np.log10(low), np.log10(high), bins + 1)
+        # Sub-0.1ms samples fall below the first edge; count them in the first bin
+        return np.histogram(np.clip(latencies, low, None), bins=edges)
+    
+    def _draw_chart(
+        self,
+        chart_path: Path,
+        chart_title: str,
+        histogram: Any,
+        summary_metrics: Dict[str, float],
+        outcomes: Dict[str, int],
+        resources: Dict[str, float]
+    ):
+        """Render the four chart panels with Pillow"""
+        width, height = _CHART_SIZE
+        image = Image.new("RGB", _CHART_SIZE, "white")
+        draw = ImageDraw.Draw(image)
+        _draw_centered(draw, (width / 2, 20), chart_title)
+        
+        half_w, half_h = width // 2, (height - 40) // 2
+        panels: List[Tuple[int, int, int, int]] = [
+            (col * half_w, 40 + row * half_h, (col + 1) * half_w, 40 + (row + 1) * half_h)
+            for row in range(2) for col in range(2)
+        ]
+        
+        # Latency distribution
+        if histogram is not None:
+            counts, edges = histogram
+            left, _, right, bottom = _draw_bars(
+                draw, panels[0], 'Latency Distribution', [], counts.tolist(), 'skyblue',
+                contiguous=True
+            )
+            _draw_centered(draw, (left, bottom + 15), f"{edges[0]:.1f}")
+            _draw_centered(draw, (right, bottom + 15), f"{edges[-1]:.1f}")
+            _draw_centered(draw, ((left + right) / 2, bottom + 30), 'Latency (ms, log scale)')
+        
+        _draw_bars(draw, panels[1], 'Latency Percentiles (ms)',
+                   list(summary_metrics), list(summary_metrics.values()), 'lightcoral')
+        _draw_pie(draw, panels[2], 'Success Rate',
+                  list(outcomes), list(outcomes.values()), ['lightgreen', 'lightcoral'])
+        _draw_bars(draw, panels[3], 'Resource Usage',
+                   list(resources), list(resources.values()), 'lightskyblue')
+        
+        image.save(chart_path)
+    
+    def _plot_chart(
+        self,
+        chart_path: Path,
+        chart_title: str,
+        histogram: Any,
+        summary_metrics: Dict[str, float],
+        outcomes: Dict[str, int],
+        resources: Dict[str, float]
+    ):
+        """Render the four chart panels with matplotlib"""
+        fig, axes = self._chart_axes()
+        fig.suptitle(chart_title, fontsize=16)
+        
+        # Latency distribution
+        if histogram is not None:
+            counts, edges = histogram
+            axes[0, 0].bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                           color='skyblue', edgecolor='black')
+            axes[0, 0].set_xscale('log')
+            axes[0, 0].set_title('Latency Distribution')
+            axes[0, 0].set_xlabel('Latency (ms)')
+            axes[0, 0].set_ylabel('Frequency')
+        
+        axes[0, 1].bar(summary_metrics.keys(), summary_metrics.values(), color='lightcoral')
+        axes[0, 1].set_title('Latency Percentiles')
+        axes[0, 1].set_ylabel('Latency (ms)')
+        
+        axes[1, 0].pie(list(outcomes.values()), labels=list(outcomes),
+                      autopct='%1.1f%%', colors=['lightgreen', 'lightcoral'])
+        axes[1, 0].set_title('Success Rate')
+        
+        axes[1, 1].bar(resources.keys(), resources.values(), color='lightskyblue')
+        axes[1, 1].set_title('Resource Usage')
+        
+        fig.tight_layout()
+        fig.savefig(chart_path, dpi=100, bbox_inches='tight')
+    
     def export_json(self, data: Dict[str, Any], filename: str = "test_results.json") -> str:
-        """Export results to JSON"""
+        """Export results to JSON, gzip-compressed when `filename` ends in .gz"""
         json_path = self.output_dir / filename
         
-        with open(json_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        if json_path.suffix == ".gz":
+            payload = orjson.dumps(data, default=str, option=_JSON_OPTIONS)
+            with gzip.open(json_path, "wb", compresslevel=4) as f:
+                f.write(payload)
+        else:
+            json_path.write_bytes(orjson.dumps(
+                data, default=str, option=_JSON_OPTIONS | orjson.OPT_INDENT_2
+            ))
         
         return str(json_path)
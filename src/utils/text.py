@@ -0,0 +1,14 @@
+"""Text helpers shared across testers"""
+
+
+def jaccard(a: str, b: str, _split=str.split) -> float:
+    """Jaccard similarity of the case-insensitive word sets of two texts"""
+    s1 = frozenset(_split(a.casefold()))
+    s2 = frozenset(_split(b.casefold()))
+    
+    if not s1 or not s2:
+        return 0.0
+    
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, so the union set is never built
+    inter = len(s1 & s2)
+    return inter / (len(s1) + len(s2) - inter)
@@ -2,8 +2,14 @@
 
 import pytest
 import os
+import numpy as np
+from click.testing import CliRunner
+from cli.commands import common
+from cli.main import cli
 from src.llm.tester import LLMTester
 from src.bias.detector import BiasDetector
+from src.bias.semantic_cache import SemanticCache
+from src.core.base import TestResult, TestStatus
 
 
 @pytest.fixture
@@ -55,3 +61,187 @@ def test_representation_bias(bias_detector):
     
     assert result is not None
     assert result.score is not None
+
+
+class CountingTester:
+    """Stand-in model tester that counts inference calls"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def test_inference(self, prompt, temperature=None):
+        self.calls += 1
+        return TestResult(
+            test_name="inference_test",
+            status=TestStatus.PASSED,
+            metadata={"prompt": prompt, "response": f"response to {prompt}"}
+        )
+
+
+class SamplingTester(CountingTester):
+    """Stand-in model tester that returns every sample from one call"""
+    
+    def test_inference_samples(self, prompt, num_samples, temperature=None, prefix=""):
+        self.calls += 1
+        return TestResult(
+            test_name="inference_samples_test",
+            status=TestStatus.PASSED,
+            metadata={
+                "prompt": prefix + prompt,
+                "responses": [f"sample {i}" for i in range(num_samples)]
+            }
+        )
+
+
+class BatchingTester(CountingTester):
+    """Stand-in model tester that answers packed prompts in one call"""
+    
+    def test_inference_batch(self, prompts, batch_size=5, temperature=None):
+        results = []
+        for start in range(0, len(prompts), batch_size):
+            self.calls += 1
+            results.extend(
+                TestResult(
+                    test_name="inference_test",
+                    status=TestStatus.PASSED,
+                    metadata={"prompt": p, "response": f"response to {p}"}
+                )
+                for p in prompts[start:start + batch_size]
+            )
+        return results
+
+
+def bag_of_words(text):
+    """Tiny deterministic encoder for semantic cache tests"""
+    vocab = ["describe", "a", "typical", "man", "woman", "professional"]
+    words = text.lower().rstrip(".").split()
+    return [float(words.count(w)) for w in vocab]
+
+
+def test_semantic_cache_reuses_deterministic_responses():
+    """Test semantic cache serves repeat samples per group at temperature 0"""
+    tester = CountingTester()
+    detector = BiasDetector(tester, semantic_cache=SemanticCache(encoder=bag_of_words))
+    
+    result = detector.test_demographic_bias(
+        prompts_template="Describe a typical {group}.",
+        demographic_groups=["man", "woman"],
+        num_samples=3,
+        temperature=0.0,
+        verbose=True
+    )
+    
+    assert result.status != TestStatus.ERROR
+    assert tester.calls == 2  # one real call per group
+    assert result.metadata["responses"]["woman"] == ["response to Describe a typical woman."] * 3
+
+
+def test_semantic_cache_skipped_when_sampling():
+    """Test semantic cache is bypassed for non-deterministic sampling"""
+    tester = CountingTester()
+    detector = BiasDetector(tester, semantic_cache=SemanticCache(encoder=bag_of_words))
+    
+    detector.test_demographic_bias(
+        prompts_template="Describe a typical {group}.",
+        demographic_groups=["man", "woman"],
+        num_samples=3
+    )
+    
+    assert tester.calls == 6
+
+
+def test_demographic_bias_batches_samples():
+    """Test each group's samples come from a single batched call"""
+    tester = SamplingTester()
+    detector = BiasDetector(tester)
+    
+    result = detector.test_demographic_bias(
+        prompts_template="Describe a typical {group}.",
+        demographic_groups=["man", "woman"],
+        num_samples=4
+    )
+    
+    assert result.status != TestStatus.ERROR
+    assert tester.calls == 2
+    assert result.metadata["responses_summary"]["man"]["n"] == 4
+    assert "responses" not in result.metadata
+
+
+def test_demographic_bias_batch_prompting():
+    """Test batch_size packs prompts for all groups into shared calls"""
+    tester = BatchingTester()
+    detector = BiasDetector(tester)
+    
+    result = detector.test_demographic_bias(
+        prompts_template="Describe a typical {group}.",
+        demographic_groups=["man", "woman"],
+        num_samples=3,
+        batch_size=4,
+        verbose=True
+    )
+    
+    assert tester.calls == 2  # six prompts, four per call
+    assert result.metadata["responses"]["woman"] == ["response to Describe a typical woman."] * 3
+
+
+def test_bias_score_matches_group_length_variance():
+    """Test bias score is the normalised variance of mean response lengths"""
+    score = BiasDetector._calculate_bias_score({"a": ["xx", "xxxx"], "b": ["x" * 10], "c": []})
+    
+    assert score == pytest.approx(np.var([3, 10]) / np.mean([3, 10]) ** 2)
+
+
+def test_analyze_sentiment_matches_whole_words():
+    """Test sentiment lexicon ignores words that merely contain a lexicon word"""
+    assert BiasDetector._analyze_sentiment("Great success, a good result") == 1.0
+    assert BiasDetector._analyze_sentiment("Goodness, what a badge") == 0.0
+    assert BiasDetector._analyze_sentiment("good but sad and wrong") == pytest.approx(-1 / 3)
+
+
+def test_group_matcher_finds_substring_mentions():
+    """Test group scan keeps substring semantics ("women" also mentions "men")"""
+    groups_in = BiasDetector._group_matcher(["Men", "women", "children"])
+    
+    assert groups_in("women lead many teams") == {"Men", "women"}
+    assert groups_in("nobody here") == set()
+
+
+class FailingTester(CountingTester):
+    """Stand-in model tester whose every inference errors"""
+    
+    def test_inference(self, prompt, temperature=None):
+        self.calls += 1
+        return TestResult(
+            test_name="inference_test", status=TestStatus.ERROR, message="rate limited"
+        )
+
+
+def test_bias_tests_error_when_every_inference_fails():
+    """Test bias tests report ERROR rather than a clean pass with no responses"""
+    detector = BiasDetector(FailingTester())
+    
+    representation = detector.test_representation_bias(["Describe leaders."], ["men", "women"])
+    sentiment = detector.test_sentiment_bias(
+        [{"prompt": "Describe a man.", "gender": "man"}], "gender"
+    )
+    demographic = detector.test_demographic_bias("Describe a typical {group}.", ["man", "woman"], 2)
+    
+    assert representation.status == TestStatus.ERROR
+    assert "rate limited" in representation.message
+    assert sentiment.status == TestStatus.ERROR
+    assert demographic.status == TestStatus.ERROR
+
+
+def test_bias_cli_reports_failed_run(monkeypatch, tmp_path):
+    """Test the test-bias command prints the error, not a score, when every inference fails"""
+    def failing_chat(self, **kwargs):
+        raise RuntimeError("connection refused")
+    
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(common._KEYS, "openai", "test-key")
+    monkeypatch.setattr(LLMTester, "_openai_chat", failing_chat)
+    
+    result = CliRunner().invoke(cli, ["test-bias"])
+    
+    assert result.exit_code == 0, result.output
+    assert "Couldn't score this run: No model responses to analyse" in result.output
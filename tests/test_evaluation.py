@@ -1,5 +1,6 @@
 """Test example for evaluation metrics"""
 
+import numpy as np
 import pytest
 from src.evaluation.metrics import EvaluationMetrics, ModelComparator
 
@@ -46,6 +47,26 @@ def test_f1_score():
     assert 0 <= score <= 1
 
 
+def test_f1_score_token_ids():
+    """Test F1 over token-id arrays matches F1 over token strings"""
+    reference = ["the", "cat", "sat", "on", "the", "mat"]
+    candidate = ["the", "cat", "is", "on", "mat"]
+    vocab = {}
+    ref_ids = np.array([vocab.setdefault(t, len(vocab)) for t in reference], dtype=np.int32)
+    cand_ids = np.array([vocab.setdefault(t, len(vocab)) for t in candidate], dtype=np.int32)
+    
+    assert EvaluationMetrics.calculate_f1_score(ref_ids, cand_ids) == pytest.approx(
+        EvaluationMetrics.calculate_f1_score(reference, candidate)
+    )
+    # Arrays of anything but integer ids are compared as token sets
+    assert EvaluationMetrics.calculate_f1_score(
+        np.array(reference), np.array(candidate)
+    ) == pytest.approx(EvaluationMetrics.calculate_f1_score(reference, candidate))
+    assert EvaluationMetrics.calculate_f1_score(
+        ref_ids.astype(np.float64), cand_ids.astype(np.float64)
+    ) == pytest.approx(EvaluationMetrics.calculate_f1_score(ref_ids, cand_ids))
+
+
 def test_semantic_similarity():
     """Test semantic similarity"""
     text1 = "the quick brown fox"
@@ -67,7 +88,7 @@ def test_diversity_score():
     
     score = EvaluationMetrics.calculate_diversity_score(texts)
     
-    assert 0 <= score <= 1
+    assert score == pytest.approx(4 / 6)
 
 
 def test_model_comparator():
@@ -89,3 +110,57 @@ def test_model_comparator():
     assert "metrics" in comparison
     assert "best_model" in comparison
     assert len(comparison["models"]) == 2
+
+
+def test_model_comparison_metrics():
+    """Test per-model aggregates and winner selection"""
+    model_results = {
+        "model_a": [
+            {"status": "passed", "score": 0.9, "execution_time_ms": 100},
+            {"status": "failed", "score": None, "execution_time_ms": 140}
+        ],
+        "model_b": [
+            {"status": "passed", "score": 0.6}
+        ],
+        "model_c": []
+    }
+    
+    comparison = ModelComparator.compare_models(model_results)
+    
+    assert comparison["metrics"]["model_a"] == {
+        "total_tests": 2,
+        "passed": 1,
+        "pass_rate": 0.5,
+        "avg_score": 0.9,
+        "avg_execution_time_ms": 120.0
+    }
+    assert comparison["metrics"]["model_c"]["pass_rate"] == 0
+    assert comparison["best_model"] == "model_b"
+
+
+def test_model_comparison_all_empty():
+    """Test models with no results at all report zeros"""
+    comparison = ModelComparator.compare_models({"model_a": [], "model_b": []})
+    
+    assert comparison["metrics"]["model_b"] == {
+        "total_tests": 0,
+        "passed": 0,
+        "pass_rate": 0.0,
+        "avg_score": 0.0,
+        "avg_execution_time_ms": 0.0
+    }
+    assert comparison["best_model"] == "model_a"
+
+
+def test_corpus_scores_match_single_pairs():
+    """Test corpus BLEU/ROUGE give the per-pair scores in order"""
+    references = ["the cat sat on the mat", "a quick brown fox"]
+    candidates = ["the cat is on the mat", "a quick brown fox"]
+    
+    bleu = EvaluationMetrics.calculate_bleu_corpus(references, candidates)
+    rouge = EvaluationMetrics.calculate_rouge_corpus(references, candidates)
+    
+    assert bleu[1] == pytest.approx(1.0)
+    assert bleu[0] == EvaluationMetrics.calculate_bleu(references[0], candidates[0])
+    assert rouge[0] == EvaluationMetrics.calculate_rouge(references[0], candidates[0])
+    assert rouge[1]["rougeL"] == pytest.approx(1.0)
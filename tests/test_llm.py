@@ -1,8 +1,15 @@
 """Test example for LLM testing"""
 
+import asyncio
 import pytest
 import os
+import threading
+import openai
+from collections import OrderedDict
+from types import SimpleNamespace as NS
 from src.llm.tester import LLMTester
+from src.llm.cache import ResponseCache
+from src.llm.prompts import PromptTestCase, PromptValidator
 from src.core.base import TestStatus
 
 
@@ -79,3 +86,475 @@ def test_test_summary(llm_tester):
     assert summary["total_tests"] == 2
     assert "passed" in summary
     assert "failed" in summary
+
+
+def test_response_cache():
+    """Test response cache hits, misses and expiry"""
+    cache = ResponseCache(ttl=60)
+    key = ResponseCache.make_key("gpt-3.5-turbo", "openai", "What is AI?", 0.0)
+    
+    assert cache.get(key) is None
+    cache.set(key, "Artificial intelligence.")
+    assert cache.get(key) == "Artificial intelligence."
+    assert key != ResponseCache.make_key("gpt-3.5-turbo", "openai", "What is AI?", 0.0, n=3)
+    assert key != ResponseCache.make_key("gpt-3.5-turbo", "openai", "What is AI?", 0.7)
+    
+    expired = ResponseCache(ttl=0)
+    expired.set(key, "stale")
+    assert expired.get(key) is None
+
+
+def test_prompt_consistency_shortcircuit(monkeypatch):
+    """Test temperature=0 consistency makes one call unless strict"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    calls = []
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        calls.append(use_cache)
+        return "4", 1.0
+    
+    monkeypatch.setattr(tester, "_generate", lambda prompt, **kwargs: calls.append(True) or "4")
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    result = tester.test_prompt_consistency("What is 2+2?", num_runs=3, temperature=0.0)
+    assert len(calls) == 1
+    assert result.score == 1.0
+    assert result.metadata["shortcircuit"] is True
+    assert result.metadata["unique_examples"] == ["4"]
+    
+    result = tester.test_prompt_consistency(
+        "What is 2+2?", num_runs=3, temperature=0.0, strict=True
+    )
+    assert calls == [True, False, False, False]  # strict runs skip the cache
+    assert result.metadata["shortcircuit"] is False
+
+
+def test_inference_many_runs_concurrently(monkeypatch):
+    """Test batched inference keeps prompt order and overlaps requests"""
+    tester = LLMTester(
+        model_name="gpt-3.5-turbo", provider="openai", api_key="test-key", concurrent_requests=4
+    )
+    
+    in_flight, peak = 0, 0
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return f"answer to {prompt}", 50.0
+    
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    results = tester.test_inference_many([f"q{i}" for i in range(8)])
+    
+    assert [r.metadata["response"] for r in results] == [f"answer to q{i}" for i in range(8)]
+    assert all(r.status == TestStatus.PASSED for r in results)
+    assert peak == 4  # two waves of four, not eight sequential calls
+
+
+def test_inference_batch_splits_numbered_answers(monkeypatch):
+    """Test packed prompts are answered by number, one result per prompt"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    packed = []
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        packed.append(prompt)
+        if "[3]" in prompt:
+            return "[1] Paris\n[2] Berlin\n[3] Rome", 30.0
+        return "[1] Madrid", 10.0  # answer [2] missing
+    
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    prompts = ["Capital of France?", "Capital of Germany?", "Capital of Italy?",
+               "Capital of Spain?", "Capital of Portugal?"]
+    results = tester.test_inference_batch(prompts, batch_size=3)
+    
+    assert len(packed) == 2
+    responses = [r.metadata.get("response") for r in results[:4]]
+    assert responses == ["Paris", "Berlin", "Rome", "Madrid"]
+    assert results[0].execution_time_ms == 10.0
+    assert results[4].status == TestStatus.FAILED
+
+
+def test_response_cache_persists_to_sqlite(tmp_path):
+    """Test a new cache on the same file sees earlier entries"""
+    path = str(tmp_path / "cache.sqlite3")
+    key = ResponseCache.make_key("gpt-3.5-turbo", "openai", "What is AI?", 0.0)
+    
+    ResponseCache(ttl=60, path=path).set(key, "Artificial intelligence.")
+    
+    assert ResponseCache(ttl=60, path=path).get(key) == "Artificial intelligence."
+    assert ResponseCache(ttl=0, path=path).get(key) is None
+
+
+def test_response_cache_lookup_is_atomic():
+    """Test another thread cannot evict an entry halfway through a lookup"""
+    cache = ResponseCache(ttl=60, maxsize=1)
+    cache.set("hit", "cached")
+    
+    class EvictDuringGet(OrderedDict):
+        def get(self, key, default=None):
+            entry = super().get(key, default)
+            # Another tester's write lands mid-lookup and evicts `key`
+            writer = threading.Thread(target=cache.set, args=("other", "value"))
+            writer.start()
+            writer.join(timeout=0.2)
+            return entry
+    
+    cache._entries = EvictDuringGet(cache._entries)
+    
+    assert cache.get("hit") == "cached"
+
+
+def test_validate_response_keywords():
+    """Test keyword checks are case-insensitive and empty responses fail"""
+    case = PromptTestCase(prompt="Capital of France?", expected_keywords=["Paris", "Seine"])
+    
+    results = PromptValidator.validate_response("PARIS is the capital.", case)
+    assert results["checks"]["keywords"]["found"] == ["Paris"]
+    assert results["checks"]["keywords"]["missing"] == ["Seine"]
+    assert results["valid"] is True
+    
+    assert PromptValidator.validate_response("   ", case)["checks"]["empty"] is True
+
+
+def test_tester_http_pool_ownership():
+    """Test testers share the process pool unless sized by concurrent_requests"""
+    shared = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    shared.close()
+    assert not shared.http_client.is_closed
+    
+    with LLMTester(
+        model_name="gpt-3.5-turbo", provider="openai", api_key="test-key", concurrent_requests=8
+    ) as owned:
+        assert owned.http_client is not shared.http_client
+    assert owned.http_client.is_closed
+
+
+def test_provider_calls_retry_transient_errors(monkeypatch):
+    """Test transient provider errors are retried and others are not"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    monkeypatch.setattr(LLMTester._openai_chat.retry, "sleep", lambda seconds: None)
+    attempts = []
+    
+    def flaky_create(**request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            raise openai.APIConnectionError(request=None)
+        return "ok"
+    
+    monkeypatch.setattr(tester.client.chat.completions, "create", flaky_create)
+    assert tester._openai_chat(model="gpt-3.5-turbo", messages=[]) == "ok"
+    assert len(attempts) == 3
+    
+    def broken_create(**request):
+        attempts.append(request)
+        raise ValueError("bad request")
+    
+    monkeypatch.setattr(tester.client.chat.completions, "create", broken_create)
+    with pytest.raises(ValueError):
+        tester._openai_chat(model="gpt-3.5-turbo", messages=[])
+    assert len(attempts) == 4
+
+
+class FakeStream:
+    """Async iterator over canned streamed chunks or events"""
+    
+    def __init__(self, events, pause=0.0):
+        self._events = iter(events)
+        self._pause = pause
+        self._started = False
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        # Optionally hold back every event after the first
+        if self._started and self._pause:
+            await asyncio.sleep(self._pause)
+        self._started = True
+        try:
+            return next(self._events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def openai_chunks(*texts, tokens=0):
+    """OpenAI stream chunks for `texts`, ending with the usage-only chunk"""
+    chunks = [NS(choices=[NS(delta=NS(content=text))], usage=None) for text in texts]
+    return chunks + [NS(choices=[], usage=NS(completion_tokens=tokens))]
+
+
+def test_stream_setup_retries_transient_errors(monkeypatch):
+    """Test a transient error opening a performance stream is retried"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    attempts = []
+    
+    async def no_sleep(seconds):
+        pass
+    
+    async def flaky_create(**request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise openai.APIConnectionError(request=None)
+        return FakeStream(openai_chunks("Hi", tokens=3))
+    
+    monkeypatch.setattr(LLMTester._aopen_stream.retry, "sleep", no_sleep)
+    client = NS(chat=NS(completions=NS(create=flaky_create)))
+    
+    ttft, total, tokens = asyncio.run(tester._atimed_stream(client, "q"))
+    
+    assert len(attempts) == 2
+    assert tokens == 3
+    assert ttft <= total
+
+
+def test_timed_stream_measures_ttft_and_tokens():
+    """Test TTFT is taken at the first text chunk and tokens come from the usage event"""
+    openai_tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    anthropic_tester = LLMTester(
+        model_name="claude-3-haiku-20240307", provider="anthropic", api_key="test-key"
+    )
+    requests = []
+    
+    async def openai_create(**request):
+        requests.append(request)
+        return FakeStream(openai_chunks("Hel", "lo", tokens=7), pause=0.05)
+    
+    async def anthropic_create(**request):
+        requests.append(request)
+        events = [
+            NS(type="message_start"),
+            NS(type="content_block_delta"),
+            NS(type="message_delta", usage=NS(output_tokens=4)),
+            NS(type="message_stop"),
+        ]
+        return FakeStream(events, pause=0.05)
+    
+    openai_client = NS(chat=NS(completions=NS(create=openai_create)))
+    anthropic_client = NS(messages=NS(create=anthropic_create))
+    
+    ttft, total, tokens = asyncio.run(openai_tester._atimed_stream(openai_client, "q"))
+    assert tokens == 7
+    assert total - ttft >= 80  # the two chunks after the first text chunk
+    assert requests[0]["stream"] and requests[0]["stream_options"] == {"include_usage": True}
+    
+    ttft, total, tokens = asyncio.run(anthropic_tester._atimed_stream(anthropic_client, "q"))
+    assert tokens == 4
+    assert total - ttft >= 80
+    assert "stream_options" not in requests[1]
+
+
+def test_performance_async_bounds_concurrency(monkeypatch):
+    """Test test_performance_async keeps at most `concurrency` streams open and sums tokens"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    in_flight, peak = 0, 0
+    
+    async def create(**request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return FakeStream(openai_chunks("Hi", tokens=5))
+    
+    async def close():
+        pass
+    
+    monkeypatch.setattr(
+        tester, "_new_async_client",
+        lambda max_connections: NS(chat=NS(completions=NS(create=create)), close=close)
+    )
+    
+    async def caller():
+        return await tester.test_performance_async(["a", "b"], num_requests=9, concurrency=3)
+    
+    with tester:
+        result = asyncio.run(caller())
+    
+    assert result.status == TestStatus.PASSED
+    assert peak == 3
+    assert result.metadata["num_requests"] == 9
+    assert result.metadata["concurrency"] == 3
+    assert len(result.metadata["latencies"]) == 9
+    assert result.metadata["ttft_ms"] <= result.metadata["total_ms"]
+    assert result.metadata["tokens_per_sec"] > 0
+
+
+def test_inference_with_prefix_marks_anthropic_prefix_cacheable(monkeypatch):
+    """Test the shared prefix goes out as a cache_control block and cache usage is recorded"""
+    tester = LLMTester(
+        model_name="claude-3-haiku-20240307", provider="anthropic", api_key="test-key"
+    )
+    requests = []
+    
+    def create(**request):
+        requests.append(request)
+        return NS(
+            content=[NS(text="Paris")],
+            usage=NS(cache_read_input_tokens=1500, cache_creation_input_tokens=0)
+        )
+    
+    monkeypatch.setattr(tester.client.messages, "create", create)
+    
+    result = tester.test_inference_with_prefix("Long shared context. ", "Capital of France?")
+    
+    assert requests[0]["messages"][0]["content"] == [
+        {"type": "text", "text": "Long shared context. ", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "Capital of France?"}
+    ]
+    assert result.status == TestStatus.PASSED
+    assert result.metadata["prompt"] == "Long shared context. Capital of France?"
+    assert result.metadata["cache_read_input_tokens"] == 1500
+    assert result.metadata["cache_creation_input_tokens"] == 0
+
+
+def test_inference_samples_per_provider(monkeypatch):
+    """Test OpenAI samples come from one n= request and Anthropic's from concurrent calls"""
+    openai_tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    openai_requests = []
+    
+    def openai_create(**request):
+        openai_requests.append(request)
+        return NS(
+            choices=[NS(message=NS(content=f"answer {i}")) for i in range(request["n"])],
+            usage=NS(prompt_tokens_details=NS(cached_tokens=0))
+        )
+    
+    monkeypatch.setattr(openai_tester.client.chat.completions, "create", openai_create)
+    
+    result = openai_tester.test_inference_samples("q", num_samples=3, temperature=0.7)
+    
+    assert len(openai_requests) == 1 and openai_requests[0]["n"] == 3
+    assert result.metadata["responses"] == ["answer 0", "answer 1", "answer 2"]
+    
+    anthropic_tester = LLMTester(
+        model_name="claude-3-haiku-20240307", provider="anthropic", api_key="test-key"
+    )
+    anthropic_requests = []
+    
+    async def anthropic_create(**request):
+        anthropic_requests.append(request)
+        return NS(
+            content=[NS(text=f"answer {len(anthropic_requests)}")],
+            usage=NS(cache_read_input_tokens=100, cache_creation_input_tokens=0)
+        )
+    
+    async def close():
+        pass
+    
+    monkeypatch.setattr(
+        anthropic_tester, "_new_async_client",
+        lambda max_connections: NS(messages=NS(create=anthropic_create), close=close)
+    )
+    
+    with anthropic_tester:
+        result = anthropic_tester.test_inference_samples("q", num_samples=3, prefix="ctx ")
+    
+    assert result.status == TestStatus.PASSED
+    assert len(anthropic_requests) == 3
+    assert sorted(result.metadata["responses"]) == ["answer 1", "answer 2", "answer 3"]
+    assert result.metadata["cache_read_input_tokens"] == 300
+
+
+def test_performance_pool_covers_concurrency(monkeypatch):
+    """Test a performance run wider than the shared pool gets its own, big enough pool"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    pools, closed = [], []
+    
+    async def create(**request):
+        return FakeStream(openai_chunks("Hi", tokens=1))
+    
+    async def close():
+        closed.append(True)
+    
+    def new_async_client(max_connections):
+        pools.append(max_connections)
+        return NS(chat=NS(completions=NS(create=create)), close=close)
+    
+    monkeypatch.setattr(tester, "_new_async_client", new_async_client)
+    
+    with tester:
+        asyncio.run(tester.test_performance_async(["q"], num_requests=10, concurrency=10))
+        asyncio.run(tester.test_performance_async(["q"], num_requests=300, concurrency=250))
+    
+    # Shared pool for the narrow run, a dedicated one for the wide run
+    assert pools == [100, 250]
+    assert len(closed) == 2
+
+
+def test_provider_cache_usage_is_recorded():
+    """Test provider prompt-cache token counts are summed from responses"""
+    openai_responses = [
+        NS(usage=NS(prompt_tokens_details=NS(cached_tokens=1024))),
+        NS(usage=NS(prompt_tokens_details=None)),
+    ]
+    anthropic_responses = [
+        NS(usage=NS(cache_read_input_tokens=0, cache_creation_input_tokens=1500)),
+        NS(usage=NS(cache_read_input_tokens=1500, cache_creation_input_tokens=0)),
+    ]
+    
+    assert LLMTester._openai_cache_usage(openai_responses) == {"cached_tokens": 1024}
+    assert LLMTester._anthropic_cache_usage(anthropic_responses) == {
+        "cache_read_input_tokens": 1500,
+        "cache_creation_input_tokens": 1500
+    }
+
+
+def test_prompt_consistency_counts_unique_responses(monkeypatch):
+    """Test sampled consistency runs are compared by digest"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    answers = iter(["4", "four", "4", "4"])
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        return next(answers), 1.0
+    
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    result = tester.test_prompt_consistency("What is 2+2?", num_runs=4, temperature=0.7)
+    
+    assert result.metadata["num_unique_responses"] == 2
+    assert result.metadata["unique_examples"] == ["4", "four"]
+    assert result.score == pytest.approx(0.75)
+
+
+def test_sync_batch_methods_inside_running_loop(monkeypatch):
+    """Test sync entry points work from async callers and share one async client"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    clients = []
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        clients.append(client)
+        return f"answer to {prompt}", 1.0
+    
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    async def caller():
+        many = tester.test_inference_many(["q1", "q2"])
+        consistency = tester.test_prompt_consistency("q", num_runs=2, temperature=0.7)
+        return many, consistency
+    
+    with tester:
+        many, consistency = asyncio.run(caller())
+    
+    assert [r.status for r in many] == [TestStatus.PASSED, TestStatus.PASSED]
+    assert consistency.status == TestStatus.PASSED
+    assert len(clients) == 4 and len(set(map(id, clients))) == 1
+
+
+def test_inference_many_handles_empty_content(monkeypatch):
+    """Test a reply with content=None fails that prompt without aborting the batch"""
+    tester = LLMTester(model_name="gpt-3.5-turbo", provider="openai", api_key="test-key")
+    
+    async def fake_ainfer(client, prompt, temperature=None, use_cache=True):
+        return (None if prompt == "filtered" else "ok"), 1.0
+    
+    monkeypatch.setattr(tester, "_ainfer", fake_ainfer)
+    
+    with tester:
+        results = tester.test_inference_many(["filtered", "fine"])
+    
+    assert [r.status for r in results] == [TestStatus.FAILED, TestStatus.PASSED]
+    assert results[0].metadata["response"] == ""
@@ -1,6 +1,9 @@
 """Test example for performance testing"""
 
+import asyncio
 import pytest
+import random
+import threading
 import time
 from src.performance.tester import PerformanceTester
 
@@ -27,6 +30,128 @@ def test_load_test():
     assert metrics.throughput_rps > 0
 
 
+async def dummy_async_inference():
+    """Dummy async inference function for testing"""
+    await asyncio.sleep(0.05)  # Simulate 50ms inference
+    return "response"
+
+
+def test_async_load_test():
+    """Test async load testing overlaps requests up to the concurrency limit"""
+    tester = PerformanceTester()
+    in_flight, peak = 0, 0
+    
+    async def tracked_inference():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await dummy_async_inference()
+        in_flight -= 1
+    
+    metrics = asyncio.run(tester.async_load_test(
+        test_function=tracked_inference,
+        num_requests=20,
+        concurrent_users=5
+    ))
+    
+    assert metrics.total_requests == 20
+    assert metrics.successful_requests == 20
+    assert metrics.avg_latency_ms >= 50
+    # 4 waves of 5 concurrent 50ms requests
+    assert peak == 5
+    assert metrics.total_duration_s >= 0.2
+
+
+def test_load_test_default_pool():
+    """Test load test sizes its worker pool when concurrent_users is unset"""
+    tester = PerformanceTester()
+    # Only passes if all 8 requests are running at the same time
+    all_running = threading.Barrier(8, timeout=5)
+    
+    metrics = tester.load_test(test_function=all_running.wait, num_requests=8)
+    
+    assert metrics.successful_requests == 8
+
+
+def test_stress_test_reuses_one_pool():
+    """Test stress intervals share a pool and run for a fixed time each"""
+    tester = PerformanceTester()
+    threads = set()
+    lock = threading.Lock()
+    in_flight, peak = 0, 0
+    
+    def tracked_inference():
+        nonlocal in_flight, peak
+        with lock:
+            threads.add(threading.get_ident())
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+    
+    metrics = tester.stress_test(
+        tracked_inference, duration_seconds=0.5, ramp_up_seconds=0.25,
+        max_concurrent_users=4, num_intervals=5
+    )
+    
+    assert 4 <= len(metrics) <= 6
+    assert all(m.failed_requests == 0 for m in metrics)
+    assert len(threads) <= 4 and 1 < peak <= 4  # load ramped up, within one pool
+    # Intervals are time-bounded; the upper bound only allows for a slow machine
+    assert all(0.1 <= m.total_duration_s < 1.0 for m in metrics[:-1])
+    assert metrics[0].total_requests <= 10  # a single user, serial requests
+
+
+def test_stress_test_digest_percentiles():
+    """Test streamed stress-test percentiles track the exact ones"""
+    pytest.importorskip("pytdigest")
+    
+    def jittered_inference():
+        time.sleep(random.uniform(0.001, 0.01))
+    
+    streamed = PerformanceTester().stress_test(
+        jittered_inference, duration_seconds=0.3, ramp_up_seconds=0, max_concurrent_users=4,
+        num_intervals=1
+    )[0]
+    exact = PerformanceTester(compat_mode=True).stress_test(
+        jittered_inference, duration_seconds=0.3, ramp_up_seconds=0, max_concurrent_users=4,
+        num_intervals=1
+    )[0]
+    
+    assert streamed.min_latency_ms <= streamed.p50_latency_ms <= streamed.max_latency_ms
+    assert streamed.p50_latency_ms == pytest.approx(exact.p50_latency_ms, rel=0.5)
+
+
+def test_load_test_in_processes():
+    """Test a picklable test function can be load-tested in worker processes"""
+    tester = PerformanceTester(use_processes=True)
+    
+    metrics = tester.load_test(test_function=dummy_inference, num_requests=8, concurrent_users=4)
+    
+    assert metrics.successful_requests == 8
+    assert metrics.avg_latency_ms >= 100
+
+
+def test_process_pool_defaults_to_cpu_count(monkeypatch):
+    """Test process-based load tests default to one worker per CPU"""
+    tester = PerformanceTester(use_processes=True)
+    sizes = []
+    real_executor = tester._executor
+    
+    def recording_executor(max_workers):
+        sizes.append(max_workers)
+        return real_executor(max_workers)
+    
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    monkeypatch.setattr(tester, "_executor", recording_executor)
+    
+    metrics = tester.load_test(test_function=dummy_inference, num_requests=8)
+    
+    assert sizes == [2]
+    assert metrics.successful_requests == 8
+
+
 def test_performance_metrics():
     """Test performance metrics calculation"""
     tester = PerformanceTester()
@@ -44,6 +169,19 @@ def test_performance_metrics():
     assert metrics.p99_latency_ms >= metrics.p95_latency_ms
 
 
+def test_resource_usage_is_measured():
+    """Test CPU and peak memory are read for the load-test window"""
+    tester = PerformanceTester()
+    
+    def busy_inference():
+        sum(range(1_000_000))
+    
+    metrics = tester.load_test(test_function=busy_inference, num_requests=20, concurrent_users=2)
+    
+    assert metrics.cpu_usage_percent > 0
+    assert metrics.memory_usage_mb > 0
+
+
 def test_metrics_serialization():
     """Test metrics can be converted to dict"""
     tester = PerformanceTester()
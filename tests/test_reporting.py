@@ -0,0 +1,142 @@
+"""Test example for report generation"""
+
+import gc
+import gzip
+import json
+import numpy as np
+import pytest
+from datetime import datetime
+from src.core.base import TestResult, TestStatus
+from src.reporting.generator import ReportGenerator
+
+
+@pytest.fixture
+def generator(tmp_path):
+    """Create report generator fixture"""
+    return ReportGenerator(output_dir=str(tmp_path))
+
+
+def test_html_report_from_generator(generator):
+    """Test HTML report accepts a one-shot iterable of results"""
+    results = (
+        {"test_name": f"test_{i}", "status": status, "score": 0.5, "message": "ok"}
+        for i, status in enumerate(["passed", "passed", "failed", "error"])
+    )
+
+    report_path = generator.generate_html_report(results, "Streamed Report")
+    html = open(report_path, encoding="utf-8").read()
+
+    assert "Streamed Report" in html
+    assert html.count('<div class="test-result ') == 4
+    assert "50.0%" in html  # pass rate
+
+
+def test_report_bundle_single_pass(generator):
+    """Test the bundle writes HTML, JSON and chart from a one-shot iterable"""
+    results = (
+        {"test_name": f"test_{i}", "status": status, "score": np.float64(0.5), "message": "ok"}
+        for i, status in enumerate(["passed", "failed", "passed"])
+    )
+    metrics = {"avg_latency_ms": 120.0, "total_requests": 3, "successful_requests": 3}
+
+    paths = generator.generate_report_bundle(
+        results, "Bundle Report", json_filename="bundle.json.gz", metrics=metrics
+    )
+
+    html = open(paths["html"], encoding="utf-8").read()
+    assert html.count('<div class="test-result ') == 3
+    with gzip.open(paths["json"]) as f:
+        data = json.load(f)
+    assert [r["test_name"] for r in data["results"]] == ["test_0", "test_1", "test_2"]
+    assert data["summary"]["passed"] == 2
+    assert data["summary"]["pass_rate"] == pytest.approx(2 / 3)
+    assert paths["chart"].endswith(".png")
+
+
+def test_export_json(generator):
+    """Test JSON export round-trips"""
+    data = {"model_name": "gpt-3.5-turbo", "total_tests": 2, "results": [{"score": 0.9}]}
+
+    json_path = generator.export_json(data, "results.json")
+
+    with open(json_path) as f:
+        assert json.load(f) == data
+
+    json_path = generator.export_json({"generated": datetime(2024, 1, 2, 3, 4, 5)}, "dated.json")
+
+    with open(json_path) as f:
+        assert json.load(f) == {"generated": "2024-01-02T03:04:05+00:00"}
+
+
+def test_export_json_gzip(generator):
+    """Test .gz exports are compressed and numpy values serialise"""
+    data = {"latencies": np.array([1.5, 2.5]), "count": np.int64(2)}
+
+    json_path = generator.export_json(data, "results.json.gz")
+
+    with gzip.open(json_path) as f:
+        assert json.load(f) == {"latencies": [1.5, 2.5], "count": 2}
+
+
+def test_performance_chart(generator):
+    """Test draft chart rendering writes a PNG without matplotlib"""
+    metrics = {
+        "avg_latency_ms": 120.0,
+        "p95_latency_ms": 200.0,
+        "total_requests": 10,
+        "successful_requests": 9,
+        "metadata": {"latencies": [100.0, 120.0, 140.0]}
+    }
+
+    chart_path = generator.generate_performance_chart(metrics)
+
+    with open(chart_path, "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_latency_histogram_log_bins():
+    """Test latency bins are log-spaced and keep every sample"""
+    latencies = [0.05, 1.0, 2.0, 5.0, 10.0, 1000.0]
+
+    counts, edges = ReportGenerator._latency_histogram(latencies, bins=4)
+
+    assert counts.sum() == len(latencies)
+    assert edges[0] == pytest.approx(0.1)
+    assert edges[-1] == pytest.approx(1000.0)
+    assert np.allclose(np.diff(np.log10(edges)), 1.0)
+
+
+def test_chart_figure_reused_and_closed(tmp_path):
+    """Test one matplotlib figure serves every chart and closes with its generator"""
+    import matplotlib.pyplot as plt
+    generator = ReportGenerator(output_dir=str(tmp_path), chart_quality="publication")
+    metrics = {"avg_latency_ms": 120.0, "total_requests": 2, "successful_requests": 2}
+
+    generator.generate_performance_chart(metrics)
+    fig = generator._fig
+    generator.generate_performance_chart(metrics)
+    assert generator._fig is fig
+    assert plt.fignum_exists(fig.number)
+
+    del generator
+    gc.collect()
+    assert not plt.fignum_exists(fig.number)
+
+
+def test_result_to_bytes():
+    """Test a result serialises straight to JSON bytes"""
+    result = TestResult(
+        test_name="performance_test",
+        status=TestStatus.PASSED,
+        score=np.float64(0.5),
+        metadata={"latencies": np.array([1.0, 2.0])}
+    )
+
+    assert json.loads(result.to_bytes()) == {
+        "test_name": "performance_test",
+        "status": "passed",
+        "score": 0.5,
+        "message": None,
+        "metadata": {"latencies": [1.0, 2.0]},
+        "execution_time_ms": None
+    }
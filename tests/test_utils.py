@@ -0,0 +1,11 @@
+"""Test example for shared utilities"""
+
+import pytest
+from src.utils.text import jaccard
+
+
+def test_jaccard():
+    """Test Jaccard similarity of word sets"""
+    assert jaccard("The cat sat", "the CAT sat") == 1.0
+    assert jaccard("a b c", "b c d") == pytest.approx(2 / 4)
+    assert jaccard("", "anything") == 0.0